@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import pickle
+import platform
+import warnings
+import numpy as np
+
+import _subroutines
+from IMG import IMG
+
+warnings.filterwarnings('ignore')
+
+def Benchmark(name,pitch,nf,options):
+    """
+    Time each stage of reconstruction of synthetic specimen.
+
+    Parameters
+    ----------
+    name : str
+        Name of synthetic project.
+    pitch : float
+        Spacing of experimental points.
+    nf : int
+        Number of increments.
+    options : dict
+        Geometry and loading of synthetic specimen, and options of IMG.
+
+    Returns
+    -------
+    result : dict
+        Grid size, wall time of each stage and volume error of run.
+
+    Notes
+    -----
+    The specimen is reconstructed by IMG with the given options, and the
+      wall time of its stages is taken from the profile of the run. The
+      plate is isochoric, so the volume of the reconstructed regular grid
+      must stay equal to its volume in the reference configuration, given
+      analytically by the trimmed grid and the thickness.
+    """
+
+    # Generate synthetic specimen and read its input file
+    stretch = _subroutines.SyntheticSpecimen(name,options['length'],
+                                             options['width'],
+                                             options['thickness'],
+                                             pitch,nf,options['strain'],
+                                             options['mode'],options['nnz'],
+                                             options['noise'],options['seed'])
+
+    path = os.path.join('input',name,f'{name}.inp')
+    inp = np.loadtxt(path,delimiter=',',usecols=(1,2))
+    nnz = int(inp[0,0])
+    xlims,ylims,zlims = inp[1,:],inp[2,:],inp[3,:]
+
+    # Reconstruct specimen with profile of stages
+    mode = _subroutines.Profiling()
+    _subroutines.EnableProfile(mode or 'time')
+    try:
+        IMG(name,nnz,xlims,ylims,zlims,name,options)
+    finally:
+        _subroutines.EnableProfile(mode)
+
+    outF = os.path.join('output',name,name)
+    with open(f'{outF}_profile.json') as f:
+        records = json.load(f)['records']
+    with open(f'{outF}.pkl','rb') as f:
+        eFEM = pickle.load(f)
+
+    # Wall time of stages of IMG summed over calls
+    times = {}
+    for record in records:
+        if '/' not in record['path']:
+            times[record['name']] = (times.get(record['name'],0.0)
+                                     + record['wall'])
+
+    nny,nnx,nnz = eFEM['X'].shape[:3]
+    ney,nex,nez = nny-1,nnx-1,nnz-1
+    vol = np.nanmax(eFEM['VOL'],(0,1,2))
+
+    # Analytic volume of trimmed grid in reference configuration
+    x = eFEM['X'][...,0]
+    lx = np.nanmax(x[...,0]) - np.nanmin(x[...,0])
+    ly = np.nanmax(x[...,1]) - np.nanmin(x[...,1])
+    known = lx*ly*options['thickness']
+
+    result = {'name': name,
+              'pitch': pitch,
+              'nny': nny,'nnx': nnx,'nnz': nnz,'nf': nf,
+              'elements': ney*nex*nez,
+              'times': times,
+              'total': sum(times.values()),
+              'volume': {'known': known,
+                         'reconstructed': vol.tolist(),
+                         'error': (np.max(abs(vol - known))/known).item()},
+              'stretch': stretch[:,-1].tolist()}
+
+    return result
+
+if __name__ == '__main__':
+
+    options = {
+                                        # float
+                   'length': 40.0,
+                                        # float
+                    'width': 20.0,
+                                        # float
+                'thickness': 2.0,
+                                        # float
+                   'strain': 0.2,
+                                        # plane-strain | uniaxial
+                     'mode': 'plane-strain',
+                                        # int
+                      'nnz': 11,
+                                        # float
+                    'noise': 0.0,
+                                        # int | None
+                     'seed': 0,
+                                        # True | False
+                   'global': False,
+                                        # lm | brent | batch
+                   'solver': 'lm',
+                                        # True | False
+                    'local': True,
+                                        # bias | optimise
+                 'strategy': 'optimise',
+                                        # total | incremental
+                'reference': 'total',
+                                        # fast | slow | colored
+                    'speed': 'colored',
+                                        # True | False
+                     'warm': False,
+                                        # sequential | parallel | shared
+               'processing': 'parallel',
+                                        # None (all cpus) | int
+                  'workers': None,
+                                        # int
+                'chunksize': 1,
+                                        # bytes | None
+                   'memory': 2**30,
+                                        # increment | trailing
+                   'layout': 'increment',
+              }
+
+    # Sweep of experimental point spacings and number of increments
+    pitches = [2.0,1.0,0.5]
+    nfs = [3,6]
+
+    results = []
+    for pitch in pitches:
+        for nf in nfs:
+            name = f'Synthetic-{pitch:g}-{nf}'
+            result = Benchmark(name,pitch,nf,options)
+            results.append(result)
+
+            print(f'{name}: {result["elements"]} elements, {nf} increments, '
+                  f'{result["total"]:.2f}s, '
+                  f'volume error {result["volume"]["error"]:.2e}')
+
+    # Write machine-readable results of sweep
+    report = {'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'platform': platform.platform(),
+              'python': platform.python_version(),
+              'numpy': np.__version__,
+              'cpus': os.cpu_count(),
+              'options': options,
+              'results': results}
+
+    os.makedirs('output',exist_ok=True)
+    with open(os.path.join('output','benchmark.json'),'w') as f:
+        json.dump(report,f,indent=4)
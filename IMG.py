@@ -1,8 +1,8 @@
+import os
 import warnings
 import numpy as np
-import matlab.engine
 from functools import partial
-from p_tqdm import t_map, p_map
+from p_tqdm import t_map
 from tqdm import tqdm
 
 import _subroutines
@@ -17,45 +17,53 @@ def IMG(name,nnz,xlims,ylims,zlims,output,options):
     # PRE-PROCESSING #
     ##################
 
-    # Start matlab engine
-    mat = matlab.engine.start_matlab()
+    # Restart profile of current process (if enabled)
+    _subroutines.EnableProfile(_subroutines.Profiling())
 
     # Create output directory
     dir = _subroutines.CreateDirectory(name,output)
 
     # Load experimental coordinates and displacements
-    expX,expU,nf = _subroutines.LoadExperimental(name,zlims)
+    with _subroutines.Stage('LoadExperimental'):
+        expX,expU,nf = _subroutines.LoadExperimental(name,zlims)
 
     # Interpolate coordinates and displacements to regular grid (front/back)
-    gridX,nny,nnx = _subroutines.RegularGrid(expX,expU,mat,nf)
+    with _subroutines.Stage('RegularGrid'):
+        gridX,nny,nnx = _subroutines.RegularGrid(expX,expU,nf)
 
     # Compute regular grid surface normals
-    gridN = _subroutines.SurfaceNormals(gridX,mat,nny,nnx,nf)
+    with _subroutines.Stage('SurfaceNormals'):
+        gridN = _subroutines.SurfaceNormals(gridX,nny,nnx,nf)
 
     # Trim regular grid in x,y directions
-    gridX,gridN,nny,nnx = _subroutines.TrimGrid(gridX,gridN,xlims,ylims)
+    with _subroutines.Stage('TrimGrid'):
+        gridX,gridN,nny,nnx = _subroutines.TrimGrid(gridX,gridN,xlims,ylims)
 
-    # Allocate space in regular grid for middle surface
+    # Allocate space in regular grid for middle surface (reconstructed later)
     gridX = np.insert(gridX,1,np.zeros((nny,nnx,3,nf)),2)
 
-    # Close matlab engine
-    mat.exit()
-
-    # Compute middle surface between front and back surfaces
-    for f in range(nf):
-        gridX[...,f] = _subroutines.MidSurface(gridX[...,f],gridN[...,f])
+    # Store arrays of increments in layout (contiguous blocks if increment)
+    layout = options['layout']
+    gridX = _subroutines.ToLayout(gridX,layout)
+    gridN = _subroutines.ToLayout(gridN,layout)
 
     # Generate linear z distribution
-    gridZ = np.ones((nny,nnx,nnz,nf)) * np.linspace(0,1,nnz)[...,None]
+    gridZ = _subroutines.Allocate((nny,nnx,nnz,nf),layout)
+    gridZ[...] = np.linspace(0,1,nnz)[...,None]
 
     # Initialize experimental finite element mesh
-    eFEM = _subroutines.ExperimentalFEM(nny,nnx,nnz,nf,dir)
+    eFEM = _subroutines.ExperimentalFEM(nny,nnx,nnz,nf,dir,layout)
+
+    # Memory budget of blocks of reconstruction and logarithmic strain
+    memory = options['memory']
 
     # Load numerical coordinates on regular grid (delete after development)
     try:
-        numX,numU,numLE,numEVOL,numVOL = _subroutines.LoadNumerical(name,
-                                                             ylims,xlims,zlims,
-                                                             nny,nnx,nnz)
+        with _subroutines.Stage('LoadNumerical'):
+            numX,numU,numLE,numEVOL,numVOL = _subroutines.LoadNumerical(name,
+                                                        ylims,xlims,zlims,
+                                                        nny,nnx,nnz,
+                                                        memory=memory)
     except:
         pass
 
@@ -70,33 +78,39 @@ def IMG(name,nnz,xlims,ylims,zlims,output,options):
     # Reconstruct deformed configurations with global volume correction
     if options['global']:
         processing = options['processing']
-        eFEM,gridX,gridN = _subroutines.GlobalVolume(eFEM,
-                                                     gridX,gridN,gridZ,
-                                                     nny,nnx,nnz,nf,
-                                                     processing)
+        solver = options['solver']
+        workers = options['workers']
+        chunksize = options['chunksize']
+        with _subroutines.Stage('GlobalVolume'):
+            eFEM,gridX,gridN = _subroutines.GlobalVolume(eFEM,
+                                                         gridX,gridN,gridZ,
+                                                         nny,nnx,nnz,nf,
+                                                         processing,solver,
+                                                         workers,chunksize,
+                                                         memory)
 
     # Reconstruct deformed configuration without global volume correction
     else:
         if options['local']:
-            hide = True
+            desc = None
         else:
-            hide = False
+            desc = 'Reconstruction'
 
-        for f in tqdm(range(nf),'Reconstruction',disable=hide):
-            # Reconstruct deformed configuration through bezier curve
-            eFEM['X'][...,f] = _subroutines.Bezier(gridX[...,f],gridZ[...,f])
-
-            # Elements volume in deformed configuration
-            eFEM['EVOL'][...,f] = _subroutines.Volume(eFEM['X'][...,f],
-                                                      nny,nnx,nnz)
+        # Middle surface, bezier curves and elements volume of all increments
+        with _subroutines.Stage('Reconstruction'):
+            _subroutines.Reconstruct(gridX,gridZ,nny,nnx,nnz,nf,gridN,memory,
+                                     eFEM['X'],eFEM['EVOL'],desc)
 
     # Reconstruct deformed configuration with local volume correction
     if options['local']:
 
         reference = options['reference']
         processing = options['processing']
+        workers = options['workers']
+        chunksize = options['chunksize']
         strategy = options['strategy']
         speed = options['speed']
+        warm = options['warm']
 
         # Generate partial function of local volume
         func = partial(_subroutines.LocalVolume,eFEM=eFEM,
@@ -106,19 +120,51 @@ def IMG(name,nnz,xlims,ylims,zlims,output,options):
                                                 strategy=strategy,
                                                 speed=speed)
 
-        # in parallel processing
-        if (processing == 'parallel') and (reference == 'total'):
-            rec = p_map(func,np.arange(1,nf),num_cpus=6,desc='Local Volume')
-
-        # in sequential processing
-        elif processing == 'sequential':
-            rec = t_map(func,np.arange(1,nf),desc='Local Volume')
-
-        # Extract results from reconstruction
-        for f in range(1,nf):
-            eFEM['X'][...,f] = rec[f-1][0]
-            eFEM['EVOL'][...,f] = rec[f-1][1]
-            gridZ[...,f] = rec[f-1][2]
+        with _subroutines.Stage('LocalVolume'):
+            # in parallel processing wrt. previous increment by speculation
+            if (processing in ['parallel','shared']) and \
+               (reference == 'incremental'):
+                eFEM,gridZ = _subroutines.IncrementalVolume(eFEM,gridX,gridZ,
+                                                            nny,nnx,nnz,nf,
+                                                            strategy,speed,
+                                                            processing,
+                                                            workers,chunksize)
+
+            # in parallel processing with results written in shared memory
+            elif (processing == 'shared') and (reference == 'total'):
+                arrays = {'eFEM': {'X': eFEM['X'],'EVOL': eFEM['EVOL']},
+                          'gridX': gridX,'gridZ': gridZ}
+                _subroutines.SharedMap(_subroutines.LocalVolume,
+                                       np.arange(1,nf),arrays,
+                                       workers,chunksize,
+                                       desc='Local Volume',chain=warm,
+                                       nny=nny,nnx=nnx,nnz=nnz,
+                                       reference=reference,
+                                       strategy=strategy,
+                                       speed=speed)
+
+            else:
+                # in parallel processing
+                if (processing == 'parallel') and (reference == 'total'):
+                    rec = _subroutines.ScheduleMap(func,np.arange(1,nf),
+                                                   workers,chunksize,
+                                                   desc='Local Volume',
+                                                   chain=warm)
+
+                # in sequential processing warm started from previous one
+                elif (processing == 'sequential') and warm:
+                    rec = [func(f,seed=f-1 if f > 1 else None)
+                           for f in tqdm(range(1,nf),desc='Local Volume')]
+
+                # in sequential processing
+                elif processing == 'sequential':
+                    rec = t_map(func,np.arange(1,nf),desc='Local Volume')
+
+                # Extract results from reconstruction
+                for f in range(1,nf):
+                    eFEM['X'][...,f] = rec[f-1][0]
+                    eFEM['EVOL'][...,f] = rec[f-1][1]
+                    gridZ[...,f] = rec[f-1][2]
 
 
     ###################
@@ -129,12 +175,14 @@ def IMG(name,nnz,xlims,ylims,zlims,output,options):
     eFEM['U'] = eFEM['X'] - eFEM['X'][...,0,None]
 
     # Logarithmic strain wrt reference configuration
-    eFEM['LE'] = _subroutines.LogStrain(eFEM['X'][...,0],eFEM['U'],
-                                        nny,nnx,nnz,nf)
+    with _subroutines.Stage('LogStrain'):
+        eFEM['LE'] = _subroutines.LogStrain(eFEM['X'][...,0],eFEM['U'],
+                                            nny,nnx,nnz,nf,fast=True,
+                                            memory=memory)
 
     # Global volume as the sum of elements volume
-    eFEM['VOL'] = (np.ones((ney,nex,nez,nf))
-                       * np.sum(eFEM['EVOL'],(0,1,2))[None,None,None,:])
+    eFEM['VOL'] = _subroutines.Allocate((ney,nex,nez,nf),layout)
+    eFEM['VOL'][...] = np.sum(eFEM['EVOL'],(0,1,2))[None,None,None,:]
 
     try:
         eFEM['rX'] = numX
@@ -150,10 +198,15 @@ def IMG(name,nnz,xlims,ylims,zlims,output,options):
         eFEM['rVOL'] = np.zeros((ney,nex,nez,nf))
 
     # Update experimental finite element mesh with mesh
-    eFEM = _subroutines.GenerateFEM(eFEM,nny,nnx,nnz,nf)
+    with _subroutines.Stage('GenerateFEM'):
+        eFEM = _subroutines.GenerateFEM(eFEM,nny,nnx,nnz,nf)
 
     # Export experimental finite element mesh on different formats
-    _subroutines.Export(eFEM,nf,dir)
+    with _subroutines.Stage('Export'):
+        _subroutines.Export(eFEM,nf,dir)
+
+    # Report profile of stages when enabled by IMG_PROFILE
+    _subroutines.ReportProfile(dir)
 
     return
 
@@ -162,23 +215,36 @@ if __name__ == '__main__':
     options = {
                                         # True | False
                    'global': False,
+                                        # lm | brent | batch
+                   'solver': 'lm',
                                         # True | False
                     'local': False,
                                         # bias | optimise
                  'strategy': 'optimise',
                                         # total | incremental
                 'reference': 'total',
-                                        # fast | slow
+                                        # fast | slow | colored
                     'speed': 'slow',
-                                        # sequential | parallel
+                                        # True | False
+                     'warm': False,
+                                        # sequential | parallel | shared
                'processing': 'parallel',
+                                        # None (all cpus) | int
+                  'workers': None,
+                                        # int
+                'chunksize': 1,
+                                        # bytes | None
+                   'memory': 2**30,
+                                        # increment | trailing
+                   'layout': 'increment',
               }
 
     name = 'Plane-Strain-Mesh0-Thin'
 
     output = f'{name}'
 
-    inp = np.loadtxt(f'input\\{name}\\{name}.inp',delimiter=',',usecols=(1,2))
+    path = os.path.join('input',name,f'{name}.inp')
+    inp = np.loadtxt(path,delimiter=',',usecols=(1,2))
 
     nnz = int(inp[0,0])
     xlims = inp[1,:]
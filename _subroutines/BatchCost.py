@@ -0,0 +1,126 @@
+import numpy as np
+
+import _subroutines
+
+def NodeColors(nny,nnx):
+    """
+    Split regular grid nodes in colors of independent 3x3 patches.
+
+    Parameters
+    ----------
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+
+    Returns
+    -------
+    colors : list of tuple
+        Node indices (I,J) of each color on masks with nan boundaries.
+
+    Notes
+    -----
+    Nodes of the same color are three nodes apart in x and y directions,
+      so that their 3x3 patches and their 2x2 adjacent elements do not
+      overlap and can be optimised simultaneously.
+    """
+
+    colors = []
+    for ci in range(3):
+        for cj in range(3):
+            I,J = np.meshgrid(np.arange(1+ci,nny+1,3),np.arange(1+cj,nnx+1,3),
+                              indexing='ij')
+            if I.size > 0:
+                colors.append((I.flatten(),J.flatten()))
+
+    return colors
+
+def NodePatches(I,J,maskX,maskZ,maskVr):
+    """
+    Gather 3x3 patches of nodes of the same color.
+
+    Parameters
+    ----------
+    I : (nc,),int
+        Indices of nodes of color in y-direction on masks.
+    J : (nc,),int
+        Indices of nodes of color in x-direction on masks.
+    maskX : (nny+2,nnx+2,3,3),float
+        Regular grid surface coordinates with nan boundaries.
+    maskZ : (nny+2,nnx+2,nnz),float
+        Z-position of points along Bézier curves with nan boundaries.
+    maskVr : (ney+2,nex+2,nez),float
+        Reference elements volume with nan boundaries.
+
+    Returns
+    -------
+    Xc : (nc,3,3,3,3),float
+        Surface coordinates of 3x3 patch of each node.
+    Zc : (nc,3,3,nnz),float
+        Z-position of points along Bézier curves of 3x3 patch of each node.
+    Vc : (nc,2,2,nez),float
+        Reference volume of 2x2 elements of each node.
+
+    Notes
+    -----
+    nc : int
+        Number of nodes of color.
+    """
+
+    # Node indices of 3x3 patches
+    pI = I[:,None,None] + np.array([-1,0,1])[None,:,None]
+    pJ = J[:,None,None] + np.array([-1,0,1])[None,None,:]
+
+    Xc = maskX[pI,pJ,...]
+    Zc = maskZ[pI,pJ,...]
+    Vc = maskVr[pI[:,:2,:2],pJ[:,:2,:2],...]
+
+    return Xc,Zc,Vc
+
+def BatchCost(Z,Xc,Zc,Vc,nnz,invariants=None):
+    """
+    Compute individual cost function of nodes of the same color at once.
+
+    Parameters
+    ----------
+    Z : (nc,nnz),float
+        Z-position of points along Bézier curves of nodes of color.
+    Xc : (nc,3,3,3,3),float
+        Surface coordinates of 3x3 patch of each node.
+    Zc : (nc,3,3,nnz),float
+        Z-position of points along Bézier curves of 3x3 patch of each node.
+    Vc : (nc,2,2,nez),float
+        Reference volume of 2x2 elements of each node.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+    invariants : tuple
+        Invariants of patches from PatchInvariants. If given, only the
+        terms of the nodes are computed.
+
+    Returns
+    -------
+    cost : (nc,),float
+        Individual cost function of each node of color.
+
+    Notes
+    -----
+    nc : int
+        Number of nodes of color.
+    """
+
+    # Compute elements volume of all patches from nodes and invariants
+    if invariants is not None:
+        optiV = _subroutines.PatchVolume(Z,invariants)
+
+    else:
+        # Update z distribution of nodes of color
+        optiZ = np.copy(Zc)
+        optiZ[:,1,1,:] = Z
+
+        # Compute elements volume of reconstructed coordinates of patches
+        optiV = _subroutines.BezierVolume(Xc,optiZ,3,3,nnz)
+
+    # Compute individual cost function
+    err = np.max(abs(optiV - Vc),3)
+
+    return np.nansum(err,(1,2))
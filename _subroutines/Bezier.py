@@ -32,7 +32,7 @@ def Bezier(gridX,gridZ):
     surf1 = gridX[...,-1,:][...,None,:]
 
     # Repeat z-position for all coordinates components
-    z = np.repeat(gridZ[...,None],3,3)
+    z = np.repeat(gridZ[...,None],3,-1)
 
     # Reconstruct internal points
     recX = (1-z)**2*surf0 + 2*(1-z)*z*surfM + z**2*surf1
@@ -0,0 +1,208 @@
+import numpy as np
+import threading
+from functools import lru_cache
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Offsets of elements corners in y,x,z directions (as in ReshapeMesh)
+CY = (1,1,1,1,0,0,0,0)
+CX = (0,1,1,0,0,1,1,0)
+CZ = (0,0,1,1,0,0,1,1)
+
+# Largest buffers (number of floats) kept between calls
+CACHED = 2**16
+
+@lru_cache(maxsize=32)
+def CachedWorkspace(key,shape,thread):
+
+    return np.empty(shape)
+
+def Workspace(key,shape):
+    """
+    Buffer of buffered kernel, reused by calls with the same small shape.
+
+    Parameters
+    ----------
+    key : str
+        Name of buffer.
+    shape : tuple
+        Shape of buffer.
+
+    Returns
+    -------
+    buffer : shape,float
+        Uninitialized buffer, shared by calls of the same thread with same
+        key and shape if it has at most CACHED floats (e.g. 3x3 patches of
+        optimisers), or new otherwise (e.g. full grids of increments).
+    """
+
+    if np.prod(shape) <= CACHED:
+        return CachedWorkspace(key,shape,threading.get_ident())
+
+    return np.empty(shape)
+
+def FusedKernel(gridX,gridZ,evol):
+
+    nb,nny,nnx,nnz = gridZ.shape
+    c = np.empty((8,3))
+    jac = np.empty((3,3))
+
+    for b in range(nb):
+        for i in range(nny-1):
+            for j in range(nnx-1):
+                for k in range(nnz-1):
+                    # Corners of element on bezier curves of its columns
+                    for n in range(8):
+                        ci,cj,ck = i+CY[n],j+CX[n],k+CZ[n]
+                        z = gridZ[b,ci,cj,ck]
+                        for d in range(3):
+                            c[n,d] = ((1-z)**2*gridX[b,ci,cj,0,d]
+                                      + 2*(1-z)*z*gridX[b,ci,cj,1,d]
+                                      + z**2*gridX[b,ci,cj,2,d])
+
+                    # Rows of jacobian matrix as sums of corner differences
+                    for d in range(3):
+                        jac[0,d] = ((c[1,d] - c[0,d]) + (c[2,d] - c[3,d])
+                                    + (c[5,d] - c[4,d]) + (c[6,d] - c[7,d]))
+                        jac[1,d] = ((c[4,d] - c[0,d]) + (c[5,d] - c[1,d])
+                                    + (c[6,d] - c[2,d]) + (c[7,d] - c[3,d]))
+                        jac[2,d] = ((c[0,d] - c[3,d]) + (c[1,d] - c[2,d])
+                                    + (c[4,d] - c[7,d]) + (c[5,d] - c[6,d]))
+
+                    # Closed-form determinant of jacobian matrix
+                    evol[b,i,j,k] = (jac[0,0]*(jac[1,1]*jac[2,2]
+                                               - jac[1,2]*jac[2,1])
+                                     + jac[0,1]*(jac[1,2]*jac[2,0]
+                                                 - jac[1,0]*jac[2,2])
+                                     + jac[0,2]*(jac[1,0]*jac[2,1]
+                                                 - jac[1,1]*jac[2,0]))/64.0
+
+    return evol
+
+# Compile fused kernel when numba is installed
+if njit is not None:
+    FusedKernel = njit(cache=True)(FusedKernel)
+
+def BufferedKernel(gridX,gridZ,evol):
+
+    nb,nny,nnx,nnz = gridZ.shape
+    ney,nex,nez = nny-1,nnx-1,nnz-1
+    shape = gridZ.shape
+
+    # Reconstructed points and nodal terms in reused buffers
+    recX = Workspace('recX',shape + (3,))
+    term = Workspace('term',shape + (3,))
+    coef = Workspace('coef',shape)
+    power = Workspace('power',shape)
+
+    # recX = (1-z)**2*X0 + 2*(1-z)*z*XM + z**2*X1
+    np.subtract(1,gridZ,out=coef)
+    np.square(coef,out=power)
+    np.multiply(power[...,None],gridX[...,None,0,:],out=recX)
+
+    np.multiply(coef,2,out=coef)
+    np.multiply(coef,gridZ,out=coef)
+    np.multiply(coef[...,None],gridX[...,None,1,:],out=term)
+    np.add(recX,term,out=recX)
+
+    np.square(gridZ,out=power)
+    np.multiply(power[...,None],gridX[...,None,2,:],out=term)
+    np.add(recX,term,out=recX)
+
+    # Views of reconstructed points on elements corners
+    X = [recX[:,CY[n]:CY[n]+ney,CX[n]:CX[n]+nex,CZ[n]:CZ[n]+nez,:]
+         for n in range(8)]
+
+    # Rows of jacobian matrix as sums of corner differences
+    shape = (nb,ney,nex,nez,3)
+    diff = Workspace('diff',shape)
+    jac = [Workspace(f'jac{r}',shape) for r in range(3)]
+    for r,pairs in enumerate([[(1,0),(2,3),(5,4),(6,7)],
+                              [(4,0),(5,1),(6,2),(7,3)],
+                              [(0,3),(1,2),(4,7),(5,6)]]):
+        np.subtract(X[pairs[0][0]],X[pairs[0][1]],out=jac[r])
+        for p,q in pairs[1:]:
+            np.subtract(X[p],X[q],out=diff)
+            np.add(jac[r],diff,out=jac[r])
+
+    # Triple product of rows of jacobian matrix
+    cross = Workspace('cross',shape[:-1])
+    for d,(p,q) in enumerate([(1,2),(2,0),(0,1)]):
+        np.multiply(jac[1][...,p],jac[2][...,q],out=cross)
+        np.multiply(jac[1][...,q],jac[2][...,p],out=diff[...,0])
+        np.subtract(cross,diff[...,0],out=cross)
+        np.multiply(jac[0][...,d],cross,out=cross)
+        if d == 0:
+            evol[...] = cross
+        else:
+            np.add(evol,cross,out=evol)
+
+    np.divide(evol,64.0,out=evol)
+
+    return evol
+
+def BezierVolume(gridX,gridZ,nny,nnx,nnz,out=None,fused=None):
+    """
+    Compute elements volume of Bézier curves without returning points.
+
+    Parameters
+    ----------
+    gridX : (...,nny,nnx,3,3),float
+        Regular grid surface coordinates.
+    gridZ : (...,nny,nnx,nnz),float
+        Z-position of points along Bézier curves.
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+    out : (...,ney,nex,nez),float
+        Preallocated elements volume. If None, a new array is returned.
+    fused : bool
+        Compute each element from its corners on the fly through the
+        compiled kernel. If None, used when numba is installed.
+
+    Returns
+    -------
+    evol : (...,ney,nex,nez),float
+        Volume of reconstructed elements on regular grid.
+
+    Notes
+    -----
+    Equal to Volume(Bezier(gridX,gridZ),nny,nnx,nnz,fast=True) with any
+      leading batch dimensions. Without numba, the points and jacobian
+      rows are computed in place in buffers, reused by calls of the same
+      small shape, so that repeated cost evaluations of optimisers on
+      patches do not allocate intermediate arrays, while buffers of full
+      grids are freed after each call. Results are bitwise equal to the
+      unfused computation in that case.
+    """
+
+    batch = gridZ.shape[:-3]
+    nb = int(np.prod(batch))
+
+    if out is None:
+        out = np.empty(batch + (nny-1,nnx-1,nnz-1))
+
+    # Leading batch dimensions in one dimension
+    X = np.reshape(gridX,(nb,nny,nnx,3,3))
+    Z = np.reshape(gridZ,(nb,nny,nnx,nnz))
+    evol = np.reshape(out,(nb,nny-1,nnx-1,nnz-1))
+
+    if fused is None:
+        fused = njit is not None
+
+    if fused:
+        FusedKernel(np.ascontiguousarray(X),np.ascontiguousarray(Z),evol)
+    else:
+        BufferedKernel(X,Z,evol)
+
+    # Copy back if volume was not reshaped as view of out
+    if not np.shares_memory(evol,out):
+        out[...] = np.reshape(evol,out.shape)
+
+    return out
@@ -1,6 +1,5 @@
 import numpy as np
 from scipy.optimize import Bounds
-from scipy.signal import savgol_filter
 from scipy.optimize import minimize
 
 import _subroutines
@@ -27,23 +26,192 @@ def GenerateBiasZ(w,optiZ,nnz):
 
     return optiZ
 
-def Optimisation(w,Xij,Zij,Vij,nnz):
+def BatchBiasZ(w,optiZ,nnz):
+
+    # Compute flow and weight of z-bias of all nodes
+    flow = np.sign(w)
+    w = np.where(flow == 0,1.0,abs(w))[:,None]
+
+    # Generate z-bias based on logarithmic function
+    n = int((nnz+1)/2)
+    bias = np.expm1(np.linspace(0,1,n)[1:-1]*np.log1p(w))/(2*w)
+
+    optiZ = np.copy(optiZ)
+    neg,pos = flow == -1,flow == 1
+
+    # Flow of z-bias from inside to outside <-:->
+    optiZ[neg,1:n-1] = bias[neg]
+    optiZ[neg,n:-1] = np.flip(abs(bias[neg] - 0.5),-1) + 0.5
+
+    # Flow of z-bias from outside to inside ->:<-
+    optiZ[pos,1:n-1] = np.flip(abs(bias[pos] - 0.5),-1)
+    optiZ[pos,n:-1] = np.flip(abs(optiZ[pos,1:n-1] - 0.5),-1) + 0.5
+
+    return optiZ
+
+def InvertBiasZ(optiZ,nnz,wmax=1e6,maxiter=64):
+
+    # Position of first and last inner points of linear z distribution
+    n = int((nnz+1)/2)
+    t = np.linspace(0,1,n)[1:-1]
+    if t.size == 0:
+        return np.zeros(optiZ.shape[:-1])
+
+    def FirstZ(w):
+        a = np.where(w == 0,1.0,abs(w))
+        with np.errstate(invalid='ignore'):
+            lo = np.expm1(t[0]*np.log1p(a))/(2*a)
+            hi = 0.5 - np.expm1(t[-1]*np.log1p(a))/(2*a)
+        return np.where(w < 0,lo,np.where(w > 0,hi,t[0]/2))
+
+    # Bisection of weights on monotone z-position of first inner point
+    z1 = optiZ[...,1]
+    lo = np.full(z1.shape,-np.arcsinh(wmax))
+    hi = np.full(z1.shape,np.arcsinh(wmax))
+    for it in range(maxiter):
+        mid = (lo + hi)/2
+        below = FirstZ(np.sinh(mid)) < z1
+        lo = np.where(below,mid,lo)
+        hi = np.where(below,hi,mid)
+
+    return np.sinh((lo + hi)/2)
+
+def ColoredBias(maskX,maskZ,maskVr,nny,nnx,nnz,wmax=1e3,maxiter=40):
+
+    # Coarse logarithmic grid of weights of both flows
+    wgrid = np.logspace(-3,np.log10(wmax),13)
+    wgrid = np.concatenate((-np.flip(wgrid),[0.0],wgrid))
+
+    # Golden ratio
+    gr = (np.sqrt(5) - 1)/2
+
+    # Optimise all nodes of each color at once
+    for I,J in _subroutines.NodeColors(nny,nnx):
+        nc = I.size
+
+        # Patches of nodes of color
+        Xc,Zc,Vc = _subroutines.NodePatches(I,J,maskX,maskZ[...,0],maskVr)
+        Zn = Zc[:,1,1,:]
+        args = (Xc,Zc,Vc,nnz,_subroutines.PatchInvariants(Xc,Zc))
+
+        def Cost(w):
+            _subroutines.CountNodes('nfev',I-1,J-1,(nny,nnx))
+            return _subroutines.BatchCost(BatchBiasZ(w,Zn,nnz),*args)
+
+        # Cost function of current z distribution
+        cost = _subroutines.BatchCost(Zn,*args)
+        _subroutines.CountNodes('calls',I-1,J-1,(nny,nnx))
+        _subroutines.CountNodes('nfev',I-1,J-1,(nny,nnx))
+
+        # Cost of each node on coarse grid of weights
+        cgrid = np.array([Cost(np.full(nc,w)) for w in wgrid])
+
+        # Bracket local minimum of each node descending from current weight
+        idx = np.argmin(abs(wgrid[:,None] - InvertBiasZ(Zn,nnz)),0)
+        nodes = np.arange(nc)
+        for step in range(wgrid.size):
+            lo = np.maximum(idx-1,0)
+            hi = np.minimum(idx+1,wgrid.size-1)
+            best = np.where(cgrid[lo,nodes] < cgrid[hi,nodes],lo,hi)
+            move = cgrid[best,nodes] < cgrid[idx,nodes]
+            if not move.any():
+                break
+            idx = np.where(move,best,idx)
+        lb = wgrid[np.maximum(idx-1,0)]
+        ub = wgrid[np.minimum(idx+1,wgrid.size-1)]
+
+        # Batched golden-section search within brackets
+        w1 = ub - gr*(ub - lb)
+        w2 = lb + gr*(ub - lb)
+        c1,c2 = Cost(w1),Cost(w2)
+        for it in range(maxiter):
+            left = c1 < c2
+
+            # Shrink brackets towards lower cost of each node
+            ub = np.where(left,w2,ub)
+            lb = np.where(left,lb,w1)
+
+            # Reuse inner point kept in bracket and evaluate new one
+            wn = np.where(left,ub - gr*(ub - lb),lb + gr*(ub - lb))
+            cn = Cost(wn)
+
+            w1,w2 = np.where(left,wn,w2),np.where(left,w1,wn)
+            c1,c2 = np.where(left,cn,c2),np.where(left,c1,cn)
+
+        w = np.where(c1 < c2,w1,w2)
+        ncost = np.minimum(c1,c2)
+
+        # Keep best weight of coarse grid if search did not improve it
+        cmin = cgrid[idx,np.arange(nc)]
+        w = np.where(cmin < ncost,wgrid[idx],w)
+        ncost = np.minimum(cmin,ncost)
+
+        # Update z distribution of nodes that improved
+        better = ncost < cost
+        maskZ[I[better],J[better],:,0] = BatchBiasZ(w[better],Zn[better],nnz)
+
+    return maskZ
+
+def GenerateBiasGradient(w,nnz):
+
+    # Compute flow and weight of z-bias
+    flow = np.sign(w)
+    w = abs(w)
+
+    # Derivative of logarithmic z-bias wrt. weight
+    n = int((nnz+1)/2)
+    t = np.linspace(0,1,n)[1:-1]
+    if w < 1e-8:
+        dbias = t*(t-1)/4
+    else:
+        dbias = (t*(w+1)**(t-1)*w - ((w+1)**t - 1))/(2*w**2)
+
+    # Derivatives of z-bias wrt. signed weight
+    dZdw = np.zeros(nnz)
+    if flow == 1:
+        dZdw[1:n-1] = -np.flip(dbias)
+        dZdw[n:-1] = dbias
+    else:
+        dZdw[1:n-1] = -dbias
+        dZdw[n:-1] = np.flip(dbias)
+
+    return dZdw
+
+def Optimisation(w,Xij,Zij,Vij,nnz,invariants=None):
+
+    # Compute elements volume from z-bias of node ij and invariants
+    if invariants is not None:
+        optiZ = np.copy(Zij[1,1,:])
+        if w[0] != 0:
+            optiZ = GenerateBiasZ(w[0],optiZ,nnz)
+        optiV = _subroutines.PatchVolume(optiZ,invariants)
+
+    else:
+        # Modify z-bias based on weight w
+        optiZ = np.copy(Zij)
+        if w[0] != 0:
+            optiZ[1,1,:] = GenerateBiasZ(w[0],optiZ[1,1,:],nnz)
+
+        # Compute elements volume of reconstructed coordinates
+        optiV = _subroutines.BezierVolume(Xij,optiZ,3,3,nnz)
+
+    # Compute individual cost function
+    return np.nansum(np.max(abs(optiV - Vij),2))
+
+def OptimisationGradient(w,Xij,Zij,Vij,nnz,invariants=None):
 
     # Modify z-bias based on weight w
     optiZ = np.copy(Zij)
     if w[0] != 0:
         optiZ[1,1,:] = GenerateBiasZ(w[0],optiZ[1,1,:],nnz)
 
-    # Reconstruct coordinates in deformed configuration
-    optiX = _subroutines.Bezier(Xij,optiZ)
-
-    # Compute elements volume
-    optiV = _subroutines.Volume(optiX,3,3,nnz)
+    # Derivatives of z-bias wrt. weight w
+    dZdw = GenerateBiasGradient(w[0],nnz)[:,None]
 
-    # Compute individual cost function
-    return np.nansum(np.max(abs(optiV - Vij),2))
+    # Compute individual cost function and its gradient
+    return _subroutines.CostGradient(Xij,optiZ,dZdw,Vij,nnz,invariants)
 
-def BiasZ(gridX,gridZ,recV,recVr,nny,nnx,nnz,speed):
+def BiasZ(gridX,gridZ,recV,recVr,nny,nnx,nnz,speed,warm=False):
 
     # Number of elements
     ney,nex,nez = nny-1,nnx-1,nnz-1
@@ -62,57 +230,75 @@ def BiasZ(gridX,gridZ,recV,recVr,nny,nnx,nnz,speed):
     # Compute cost function
     cost = np.nansum(np.max(abs(recV - maskVr[1:-1,1:-1,...]),2))
 
+    # Initial weight of nodes (current z distribution if zero)
+    W0 = np.zeros((nny+2,nnx+2))
+
+    # Initial weight of nodes from bias of seeded z distribution
+    if warm:
+        W0[1:-1,1:-1] = InvertBiasZ(gridZ,nnz)
+
     # Initialize while loop control variables
-    w0 = 0.0
     it = 0
     tol = 1e-8
 
     print(f'\nIteration: {it} ({cost/ne:.8f})')
     while True:
-        for i in range(1,nny+1):
-            i0,i1 = i-1,i+2
-            for j in range(1,nnx+1):
-                j0,j1 = j-1,j+2
-
-                # Opimize z distribution of nodes ij
-                if speed == 'slow':
-                    opti = minimize( Optimisation,
-                                     x0=[w0],
-                                     method='Nelder-Mead',
-                                     options={'adaptive': True,
-                                              'xatol': 1e-8,
-                                              'fatol': 1e-8},
-                                     args=(maskX[i0:i1,j0:j1,...],
-                                           maskZ[i0:i1,j0:j1,:,0],
-                                           maskVr[i0:i1-1,j0:j1-1,:],
-                                           nnz)
-                                   )
-
-                elif speed == 'fast':
-                    opti = minimize( Optimisation,
-                                     x0=w0,
-                                     method='SLSQP',
-                                     options={'fatol': 1e-8},
-                                     args=(maskX[i0:i1,j0:j1,...],
-                                           maskZ[i0:i1,j0:j1,:,0],
-                                           maskVr[i0:i1-1,j0:j1-1,:],
-                                           nnz)
-                                   )
-
-                # Check if individual solution improved
-                w1 = opti.x[0]
-                if w1 != w0:
-                    maskZ[i,j,:,0] = GenerateBiasZ(w1,maskZ[i,j,:,0],nnz)
-
-        # Smooth z-bias in x-direction
-        for i in range(1,nny+1):
-            for k in range(1,nnz-1):
-                maskZ[i,1:-1,k,0] = savgol_filter(maskZ[i,1:-1,k,0],nnx,2)
-
-        # Smooth z-bias in y-direction
-        for j in range(1,nnx+1):
-            for k in range(1,nnz-1):
-                maskZ[1:-1,j,k,0] = savgol_filter(maskZ[1:-1,j,k,0],nny,2)
+        # Optimise independent nodes of each color at once
+        if speed == 'colored':
+            maskZ = ColoredBias(maskX,maskZ,maskVr,nny,nnx,nnz)
+
+        # Optimise each node sequentially
+        else:
+            for i in range(1,nny+1):
+                i0,i1 = i-1,i+2
+                for j in range(1,nnx+1):
+                    j0,j1 = j-1,j+2
+                    w0 = W0[i,j]
+
+                    # Terms of patch independent of node ij
+                    inv = _subroutines.PatchInvariants(maskX[i0:i1,j0:j1,...],
+                                                       maskZ[i0:i1,j0:j1,:,0])
+
+                    # Opimize z distribution of nodes ij
+                    if speed == 'slow':
+                        opti = minimize( Optimisation,
+                                         x0=[w0],
+                                         method='Nelder-Mead',
+                                         options={'adaptive': True,
+                                                  'xatol': 1e-8,
+                                                  'fatol': 1e-8},
+                                         args=(maskX[i0:i1,j0:j1,...],
+                                               maskZ[i0:i1,j0:j1,:,0],
+                                               maskVr[i0:i1-1,j0:j1-1,:],
+                                               nnz,inv)
+                                       )
+
+                    elif speed == 'fast':
+                        opti = minimize( OptimisationGradient,
+                                         x0=w0,
+                                         jac=True,
+                                         method='SLSQP',
+                                         options={'fatol': 1e-8},
+                                         args=(maskX[i0:i1,j0:j1,...],
+                                               maskZ[i0:i1,j0:j1,:,0],
+                                               maskVr[i0:i1-1,j0:j1-1,:],
+                                               nnz,inv)
+                                       )
+
+                    # Count optimiser calls and cost evaluations of node
+                    _subroutines.CountNodes('calls',i-1,j-1,(nny,nnx))
+                    _subroutines.CountNodes('nfev',i-1,j-1,(nny,nnx),
+                                            opti.nfev)
+
+                    # Check if individual solution improved
+                    w1 = opti.x[0]
+                    if w1 != w0:
+                        maskZ[i,j,:,0] = GenerateBiasZ(w1,maskZ[i,j,:,0],nnz)
+
+        _subroutines.Count('sweeps')
+
+        # Smooth z-bias in x and y directions
+        maskZ = _subroutines.SmoothZ(maskZ,nny,nnx,nnz)
 
         # Reconstruct coordinates in deformed configuration
         itX = _subroutines.Bezier(gridX,maskZ[1:-1,1:-1,:,0])
@@ -0,0 +1,108 @@
+import numpy as np
+
+import _subroutines
+
+def CostGradient(Xij,optiZ,dZdw,Vij,nnz,invariants=None):
+    """
+    Compute individual cost function of node and its analytic gradient.
+
+    Parameters
+    ----------
+    Xij : (3,3,3,3),float
+        Surface coordinates of 3x3 patch of node.
+    optiZ : (3,3,nnz),float
+        Z-position of points along Bézier curves of 3x3 patch of node.
+    dZdw : (nnz,nw),float
+        Derivatives of z-position of node wrt. optimisation weights.
+    Vij : (2,2,nez),float
+        Reference volume of 2x2 elements of node.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+    invariants : tuple
+        Invariants of patch from PatchInvariants. If given, only the terms
+        of the node are computed.
+
+    Returns
+    -------
+    cost : float
+        Individual cost function of node.
+    grad : (nw,),float
+        Gradient of individual cost function wrt. optimisation weights.
+
+    Notes
+    -----
+    nw : int
+        Number of optimisation weights.
+
+    Theory
+    ------
+    The reconstructed points are quadratic in z through the Bézier curve
+
+        dX/dz = 2*(z-1)*X0 + 2*(1-2*z)*XM + 2*z*X1,
+
+      and the derivative of the element volume evol = 8*det(jac) wrt. the
+      coordinates of corner c is given by the cofactors of jac
+
+        devol/dXc = 8 * sum_r dNdNr[r,c] * cof(jac)[r,:],
+
+      with cof(jac) rows equal to jac_eta x jac_zeta, jac_zeta x jac_xi
+      and jac_xi x jac_eta. The cost function is the sum of the maximum
+      absolute volume error through thickness of each element, so its
+      gradient is the sum of the volume derivatives of the elements with
+      maximum error, signed by the error.
+    """
+
+    # Elements volume and derivatives through invariants of patch
+    if invariants is not None:
+        evol,dVdz = _subroutines.PatchVolume(optiZ[1,1,:],invariants,True)
+
+    else:
+        # Corners of elements of 2x2 patch at node in bottom/top z layers
+        lo = _subroutines.LO
+        hi = _subroutines.HI
+
+        # Reconstruct coordinates in deformed configuration
+        optiX = _subroutines.Bezier(Xij,optiZ)
+
+        # Derivatives of reconstructed coordinates of node wrt. z-position
+        z = optiZ[1,1,:,None]
+        dXdz = (2*(z-1)*Xij[1,1,0,:] + 2*(1-2*z)*Xij[1,1,1,:]
+                + 2*z*Xij[1,1,-1,:])
+
+        # Jacobian matrix and volume of elements
+        coord = _subroutines.ReshapeMesh(optiX,3,3,nnz)
+        dNdNr,jac,evol = _subroutines.ElHex8R(coord)
+
+        # Derivatives of elements volume wrt. corners coordinates
+        cof = np.stack((np.cross(jac[:,1,:],jac[:,2,:]),
+                        np.cross(jac[:,2,:],jac[:,0,:]),
+                        np.cross(jac[:,0,:],jac[:,1,:])),1)
+        dVdX = np.reshape(8.0 * (dNdNr.T @ cof),(2,2,nnz-1,8,3))
+
+        # Derivatives of elements volume wrt. z-position of node
+        k = np.arange(nnz-1)
+        dVdz = np.zeros((2,2,nnz-1,nnz))
+        for a in range(2):
+            for b in range(2):
+                dVdz[a,b,k,k] = np.sum(dVdX[a,b,:,lo[a][b],:]*dXdz[:-1],1)
+                dVdz[a,b,k,k+1] = np.sum(dVdX[a,b,:,hi[a][b],:]*dXdz[1:],1)
+
+        # Volume of 2x2 elements of node
+        evol = np.reshape(evol,(2,2,nnz-1))
+
+    # Derivatives of elements volume wrt. weights
+    dVdw = dVdz @ dZdw
+
+    # Compute individual cost function
+    err = evol - Vij
+    errmax = np.max(abs(err),2)
+    cost = np.nansum(errmax)
+
+    # Gradient through elements with maximum volume error
+    valid = ~np.isnan(errmax)
+    kmax = np.argmax(abs(err[valid]),1)
+    ivalid = np.arange(kmax.size)
+    sign = np.sign(err[valid][ivalid,kmax])
+    grad = np.sum(sign[:,None] * dVdw[valid][ivalid,kmax,:],0)
+
+    return cost,grad
@@ -19,11 +19,11 @@ def CreateDirectory(name,output):
     cwd = os.getcwd()
     dir = f'{output}'
 
-    path = f'{cwd}\\output\\{dir}'
+    path = os.path.join(cwd,'output',dir)
     if os.path.isdir(path):
         shutil.rmtree(path)
 
-    os.mkdir(path)
+    os.makedirs(path)
 
     return dir
 
@@ -0,0 +1,52 @@
+import numpy as np
+
+def EigenStrain(dfgrd,nf=None):
+    """
+    Compute the logarithmic strain in voigt notation by the symmetric
+      eigendecomposition of the left Cauchy-Green deformation tensor.
+
+    Parameters
+    ----------
+    dfgrd : (ne,3,3) or (nf,ne,3,3),float
+        Deformation gradient.
+    nf : int
+        Number of increments.
+
+    Returns
+    -------
+    voigt : (ne,6) or (ne,6,nf),float
+        Logarithmic strain in voigt notation.
+
+    Notes
+    -----
+    ne : int
+        Number of elements.
+
+    Theory
+    ------
+    The left stretch tensor V of the polar decomposition F = VR satisfies
+        V^2 = F F' = Q diag(lambda) Q',
+      so that the logarithmic strain follows from one symmetric
+      eigendecomposition as
+        ln(V) = 1/2 Q diag(ln(lambda)) Q'.
+      Each voigt component (i,j) is assembled directly as
+        1/2 sum_k Q[i,k] Q[j,k] ln(lambda[k]),
+      with shear components doubled.
+    """
+
+    # Indices and factors of voigt components
+    i = [0,1,2,0,0,1]
+    j = [0,1,2,1,2,2]
+    factor = np.array([1.0,1.0,1.0,2.0,2.0,2.0])/2
+
+    # Eigendecomposition of left Cauchy-Green deformation tensor
+    eigv,eigpr = np.linalg.eigh(dfgrd @ np.moveaxis(dfgrd,-1,-2))
+
+    # Logarithmic strain in voigt notation
+    voigt = (eigpr[...,i,:]*eigpr[...,j,:]) @ np.log(eigv)[...,None]
+    voigt = voigt[...,0] * factor
+
+    if nf is not None:
+        voigt = np.moveaxis(voigt,0,-1)
+
+    return voigt
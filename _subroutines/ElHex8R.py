@@ -1,22 +1,24 @@
 import numpy as np
 
-def ElHex8R(coord):
+def ElHex8R(coord,volume=False):
     """
     8-Node hexahedral element w. reduced integration.
 
     Parameters
     ----------
-    coord : (ne,8,3) or (nf,ne,8,3),float
-        Reference nodal coordinates.
+    coord : (ne,8,3) or (nf,ne,8,3),float or tuple of 8 (...,3),float
+        Reference nodal coordinates, or views of the elements corners.
+    volume : bool
+        Compute only elements volume through closed-form determinant.
 
     Returns
     -------
-    dNdNr : (ne,3,8) or (nf,ne,3,8),float
+    dNdNr : (3,8),float
         Shape function derivatives wrt. natural coordinates.
-    jac : (ne,3,3) or (nf,ne,3,3),float
+    jac : (ne,3,3) or (nf,ne,3,3) or (...,3,3),float
         Jacobian matrix.
-    evol : (ne,) or (nf,ne),float
-        Elements volume.
+    evol : (ne,) or (nf,ne) or (...),float
+        Elements volume. If volume is True, it is the only output.
 
     Notes
     -----
@@ -43,15 +45,43 @@ def ElHex8R(coord):
          dNdNr_eta =  eta *   (1+xi*xi0)*(1+zeta*zeta0) /8
         dNdNr_zeta = zeta *   (1+xi*xi0)*  (1+eta*eta0) /8
 
+    Each row of the jacobian matrix is then a sum of corner differences
+
+          jac_xi = ((X1-X0) + (X2-X3) + (X5-X4) + (X6-X7)) /8
+         jac_eta = ((X4-X0) + (X5-X1) + (X6-X2) + (X7-X3)) /8
+        jac_zeta = ((X0-X3) + (X1-X2) + (X4-X7) + (X5-X6)) /8
+
+    and the element volume is given by the triple product
+
+        evol = 8 * jac_xi . (jac_eta x jac_zeta).
+
     """
 
+    # Elements volume by closed-form determinant of jacobian matrix
+    if volume:
+        if isinstance(coord,tuple):
+            X = coord
+        else:
+            X = [coord[...,c,:] for c in range(8)]
+
+        jxi = (X[1] - X[0]) + (X[2] - X[3]) + (X[5] - X[4]) + (X[6] - X[7])
+        jeta = (X[4] - X[0]) + (X[5] - X[1]) + (X[6] - X[2]) + (X[7] - X[3])
+        jzeta = (X[0] - X[3]) + (X[1] - X[2]) + (X[4] - X[7]) + (X[5] - X[6])
+
+        evol = np.sum(jxi * np.cross(jeta,jzeta),-1)/64.0
+
+        return evol
+
     # Shape function derivatives wrt natural coordinates
     dNdNr = np.array([[-1, 1, 1,-1,-1, 1, 1,-1],
                       [-1,-1,-1,-1, 1, 1, 1, 1],
                       [ 1, 1,-1,-1, 1, 1,-1,-1]])/8
 
     # Jacobian matrix
-    jac = dNdNr @ coord
+    if isinstance(coord,tuple):
+        jac = sum(dNdNr[:,c,None] * coord[c][...,None,:] for c in range(8))
+    else:
+        jac = dNdNr @ coord
 
     # Elements volume
     evol = np.linalg.det(jac)*8.0
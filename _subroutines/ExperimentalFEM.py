@@ -1,6 +1,6 @@
-import numpy as np
+import _subroutines
 
-def ExperimentalFEM(nny,nnx,nnz,nf,dir):
+def ExperimentalFEM(nny,nnx,nnz,nf,dir,layout='trailing'):
     """
     Initialize experimental finite element mesh dict for storage.
 
@@ -16,6 +16,8 @@ def ExperimentalFEM(nny,nnx,nnz,nf,dir):
         Number of increments.
     dir : str
         Directory of project to export output files.
+    layout : str
+        Storage layout of arrays of increments, increment | trailing.
 
     Returns
     -------
@@ -28,10 +30,10 @@ def ExperimentalFEM(nny,nnx,nnz,nf,dir):
 
     # Initialize experimental finite element mesh
     eFEM = {   'Name': f'{dir}',
-               'X': np.zeros((nny,nnx,nnz,3,nf)),
+               'X': _subroutines.Allocate((nny,nnx,nnz,3,nf),layout),
             #    'U': np.zeros((nny,nnx,nnz,3,nf)),
             #   'LE': np.zeros((ney,nex,nez,6,nf)),
-            'EVOL': np.zeros((ney,nex,nez,  nf)),
+            'EVOL': _subroutines.Allocate((ney,nex,nez,  nf),layout),
             #  'VOL':  np.ones((ney,nex,nez,  nf)),
             }
 
@@ -1,3 +1,4 @@
+import os
 import numpy as np
 
 def ExportCSV(eFEM,nf,dir):
@@ -14,7 +15,7 @@ def ExportCSV(eFEM,nf,dir):
         Directory of project to export output files.
     """
 
-    outF = f'output\\{dir}\\{dir}'
+    outF = os.path.join('output',dir,dir)
 
     # Export nodal coordinates
     path = f'{outF}_Nodes.csv'
@@ -1,3 +1,4 @@
+import os
 import scipy.io
 
 def ExportMatlab(eFEM,dir):
@@ -12,7 +13,7 @@ def ExportMatlab(eFEM,dir):
         Directory of project to export output files.
     """
 
-    outF = f'output\\{dir}\\{dir}'
+    outF = os.path.join('output',dir,dir)
 
     # Save experimental finite element mesh to mat file
     with open(f'{outF}.mat','wb') as f:
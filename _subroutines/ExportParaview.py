@@ -25,7 +25,7 @@ def ExportParaview(eFEM,nf,dir):
     eFEM['Mesh']['rLE'] = eFEM['Mesh']['rLE'][:,[0,1,2,3,5,4],:]
 
     # Output paraview file
-    outF = f'{os.getcwd()}\\output\\{dir}\\{dir}'
+    outF = os.path.join(os.getcwd(),'output',dir,dir)
     with meshio.xdmf.TimeSeriesWriter(f'{outF}.xdmf') as w:
         w.write_points_cells(points,cells)
         for f in range(nf):
@@ -1,3 +1,4 @@
+import os
 import pickle
 
 def ExportPickle(eFEM,dir):
@@ -12,7 +13,7 @@ def ExportPickle(eFEM,dir):
         Directory of project to export output files.
     """
 
-    outF = f'output\\{dir}\\{dir}'
+    outF = os.path.join('output',dir,dir)
 
     # Save experimental finite element mesh to pickle file
     with open(f'{outF}.pkl','wb') as f:
@@ -1,5 +1,26 @@
 import numpy as np
 
+import _subroutines
+
+def MeshField(field,shape):
+
+    # Reshape regular grid field to vector form in its storage layout
+    nf = field.shape[-1]
+    if _subroutines.Layout(field) == 'increment':
+        field = np.reshape(np.moveaxis(field,-1,0),(nf,) + shape)
+        return np.moveaxis(field,0,-1)
+
+    return np.reshape(field,shape + (nf,))
+
+def DeleteNan(field):
+
+    # Delete rows of nan values in storage layout of field
+    nans = np.isnan(field[:,0,0] if field.ndim == 3 else field[:,0])
+    if _subroutines.Layout(field) == 'increment':
+        return np.moveaxis(np.delete(np.moveaxis(field,-1,0),nans,1),0,-1)
+
+    return np.delete(field,nans,0)
+
 def GenerateFEM(eFEM,nny,nnx,nnz,nf):
     """
     Generate finite element mesh from regular grid.
@@ -34,30 +55,30 @@ def GenerateFEM(eFEM,nny,nnx,nnz,nf):
     grid3D = eFEM['X'][...,0]
 
     # Reshape quantities from matrix to vector
-    meshX = np.reshape(eFEM['X'],(nn,3,nf))
-    meshU = np.reshape(eFEM['U'],(nn,3,nf))
-    meshLE = np.reshape(eFEM['LE'],(ne,6,nf))
-    meshEVOL = np.reshape(eFEM['EVOL'],(ne,nf))
-    meshVOL = np.reshape(eFEM['VOL'],(ne,nf))
-
-    rX = np.reshape(eFEM['rX'],(nn,3,nf))
-    rU = np.reshape(eFEM['rU'],(nn,3,nf))
-    rLE = np.reshape(eFEM['rLE'],(ne,6,nf))
-    rEVOL = np.reshape(eFEM['rEVOL'],(ne,nf))
-    rVOL = np.reshape(eFEM['rVOL'],(ne,nf))
+    meshX = MeshField(eFEM['X'],(nn,3))
+    meshU = MeshField(eFEM['U'],(nn,3))
+    meshLE = MeshField(eFEM['LE'],(ne,6))
+    meshEVOL = MeshField(eFEM['EVOL'],(ne,))
+    meshVOL = MeshField(eFEM['VOL'],(ne,))
+
+    rX = MeshField(eFEM['rX'],(nn,3))
+    rU = MeshField(eFEM['rU'],(nn,3))
+    rLE = MeshField(eFEM['rLE'],(ne,6))
+    rEVOL = MeshField(eFEM['rEVOL'],(ne,))
+    rVOL = MeshField(eFEM['rVOL'],(ne,))
 
     # Delete nan values
-    eFEM['Mesh']['X'] = np.delete(meshX,np.isnan(meshX[:,0,0]),0)
-    eFEM['Mesh']['U'] = np.delete(meshU,np.isnan(meshU[:,0,0]),0)
-    eFEM['Mesh']['LE'] = np.delete(meshLE,np.isnan(meshLE[:,0,0]),0)
-    eFEM['Mesh']['EVOL'] = np.delete(meshEVOL,np.isnan(meshEVOL[:,0]),0)
-    eFEM['Mesh']['VOL'] = np.delete(meshVOL,np.isnan(meshVOL[:,0]),0)
-
-    eFEM['Mesh']['rX'] = np.delete(rX,np.isnan(rX[:,0,0]),0)
-    eFEM['Mesh']['rU'] = np.delete(rU,np.isnan(rU[:,0,0]),0)
-    eFEM['Mesh']['rLE'] = np.delete(rLE,np.isnan(rLE[:,0,0]),0)
-    eFEM['Mesh']['rEVOL'] = np.delete(rEVOL,np.isnan(rEVOL[:,0]),0)
-    eFEM['Mesh']['rVOL'] = np.delete(rVOL,np.isnan(rVOL[:,0]),0)
+    eFEM['Mesh']['X'] = DeleteNan(meshX)
+    eFEM['Mesh']['U'] = DeleteNan(meshU)
+    eFEM['Mesh']['LE'] = DeleteNan(meshLE)
+    eFEM['Mesh']['EVOL'] = DeleteNan(meshEVOL)
+    eFEM['Mesh']['VOL'] = DeleteNan(meshVOL)
+
+    eFEM['Mesh']['rX'] = DeleteNan(rX)
+    eFEM['Mesh']['rU'] = DeleteNan(rU)
+    eFEM['Mesh']['rLE'] = DeleteNan(rLE)
+    eFEM['Mesh']['rEVOL'] = DeleteNan(rEVOL)
+    eFEM['Mesh']['rVOL'] = DeleteNan(rVOL)
 
     # Extract mesh coordinates
     eFEM['Mesh']['Nodes'] = eFEM['Mesh']['X'][:,:,0]
@@ -1,9 +1,7 @@
 import numpy as np
-from tqdm import tqdm
 from functools import partial
-from p_tqdm import t_map, p_map
-from sklearn.metrics import r2_score
-from scipy.optimize import least_squares
+from p_tqdm import t_map
+from scipy.optimize import least_squares, brentq
 
 import _subroutines
 
@@ -17,11 +15,8 @@ def Optimisation(w,gridX,gridN,gridZ,Vr,nny,nnx,nnz):
     # Middle surface between front and back surfaces
     tmpX = _subroutines.MidSurface(gridX,optiN)
 
-    # Reconstruct deformed configuration through bezier curve
-    optiX = _subroutines.Bezier(tmpX,gridZ)
-
-    # Elements volume in deformed configuration
-    optiV = _subroutines.Volume(optiX,nny,nnx,nnz)
+    # Elements volume of deformed configuration through bezier curve
+    optiV = _subroutines.BezierVolume(tmpX,gridZ,nny,nnx,nnz)
 
     # Total volume
     tmpV = np.sum(optiV)
@@ -31,118 +26,280 @@ def Optimisation(w,gridX,gridN,gridZ,Vr,nny,nnx,nnz):
     else:
         return optiV.flatten()
 
-def GlobalCorrection(f,eFEM,gridX,gridN,gridZ,pfit,nny,nnx,nnz):
+def TotalVolume(w,gridX,gridN,gridZ,nny,nnx,nnz):
 
-    # Volume of reference by linear regression
-    Vr = pfit[0]*f + pfit[-1]
+    nb = w.size
 
-    # Opimize surface normals components
-    # w0 = [1.0,1.0,1.0]
-    w0 = 1.0
-    opti = least_squares( Optimisation,
-                          x0=w0,
-                          method='lm',
-                          x_scale='jac',
-                          args=(gridX[...,f],gridN[...,f],gridZ[...,f],
-                                Vr,nny,nnx,nnz))
+    # Increments as leading dimension of batch
+    optiX = np.moveaxis(gridX,-1,0)
+    optiN = np.moveaxis(gridN,-1,0)
+    optiZ = np.moveaxis(gridZ,-1,0)
 
-    # If solution improves, update configuration
-    w1 = opti.x[0]
-    if (w1 != w0).any():
-        gridN[...,f] = [1.0,1.0,w1] * gridN[...,f]
-        mag = np.sqrt(np.sum(gridN[...,f]**2,3))
-        gridN[...,f] = gridN[...,f] / mag[...,None]
+    # Update surface normals through z component
+    scale = np.ones((nb,1,1,1,3))
+    scale[...,2] = np.reshape(w,(nb,1,1,1))
+    optiN = scale * optiN
+    mag = np.sqrt(np.sum(optiN**2,-1))
+    optiN = optiN / mag[...,None]
 
-        # Middle surface between front and back surfaces
-        gridX[...,f] = _subroutines.MidSurface(gridX[...,f],
-                                               gridN[...,f])
+    # Middle surface between front and back surfaces
+    tmpX = _subroutines.MidSurface(np.copy(optiX),optiN)
 
-        # Reconstructed points through bezier curve
-        eFEM['X'][...,f] = _subroutines.Bezier(gridX[...,f],
-                                               gridZ[...,f])
+    # Elements volume of deformed configuration through bezier curve
+    optiV = _subroutines.BezierVolume(tmpX,optiZ,nny,nnx,nnz)
 
-        # Elements volume in deformed configuration
-        eFEM['EVOL'][...,f] = _subroutines.Volume(eFEM['X'][...,f],
-                                                  nny,nnx,nnz)
+    # Total volume of each increment
+    return np.sum(optiV,(1,2,3))
 
-    return eFEM['X'][...,f],eFEM['EVOL'][...,f],gridX[...,f],gridN[...,f]
+def BracketRoot(func,nb,factor=2.0,maxiter=30):
+
+    # Residual of initial weight
+    a = np.ones(nb)
+    ga = func(a,np.arange(nb))
+    b,gb = np.copy(a),np.copy(ga)
+
+    # Increments with nan residual of initial weight cannot be bracketed
+    found = ga == 0
+    valid = np.isfinite(ga)
 
-def GlobalVolume(eFEM,gridX,gridN,gridZ,nny,nnx,nnz,nf,processing):
+    # Expand brackets multiplicatively in both directions until sign change
+    #   of finite residuals (nan residuals keep expanding)
+    for it in range(1,maxiter+1):
+        for w in [factor**it,factor**-it]:
+            idx = np.flatnonzero(~found & valid)
+            if idx.size == 0:
+                return a,b,ga,gb,found
 
-    # Reconstruct undeformed configuration through bezier curve
-    eFEM['X'][...,0] = _subroutines.Bezier(gridX[...,0],gridZ[...,0])
+            gw = func(np.full(idx.size,w),idx)
 
-    # Elements volume in undeformed configuration
-    eFEM['EVOL'][...,0] = _subroutines.Volume(eFEM['X'][...,0],
-                                              nny,nnx,nnz)
+            change = np.isfinite(gw) & (np.sign(gw) != np.sign(ga[idx]))
+            b[idx[change]] = w
+            gb[idx[change]] = gw[change]
+            found[idx[change]] = True
 
-    elastic = True
-    correlation = False
-    correction = False
+    return a,b,ga,gb,found
 
-    for f in tqdm(range(1,nf),leave=False,desc='Global Volume'):
+def BatchCorrection(incs,eFEM,gridX,gridN,gridZ,pfit,nny,nnx,nnz,
+                    tol=1e-12,maxiter=100):
 
-        # Reconstruct deformed configuration through bezier curve
+    nb = incs.size
+
+    # Volume of reference by linear regression
+    Vr = np.polyval(pfit,incs)
+
+    def func(w,idx):
+        f = incs[idx]
+        return TotalVolume(w,gridX[...,f],gridN[...,f],gridZ[...,f],
+                           nny,nnx,nnz) - Vr[idx]
+
+    # Bracket root of total volume of all increments
+    a,b,ga,gb,found = BracketRoot(func,nb)
+
+    # Batched Illinois method within brackets
+    w1 = np.copy(a)
+    active = found & (ga != 0)
+    for it in range(maxiter):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+
+        # Secant of bracket of each increment
+        c = b[idx] - gb[idx]*(b[idx] - a[idx])/(gb[idx] - ga[idx])
+        gc = func(c,idx)
+
+        # Keep sign change within bracket and halve retained residual
+        change = np.sign(gc) != np.sign(gb[idx])
+        a[idx] = np.where(change,b[idx],a[idx])
+        ga[idx] = np.where(change,gb[idx],ga[idx]/2)
+        b[idx],gb[idx] = c,gc
+
+        w1[idx] = c
+        converged = ((abs(gc) <= tol*abs(Vr[idx]))
+                     | (abs(b[idx] - a[idx]) <= tol*abs(c)))
+        active[idx[converged]] = False
+
+    # Update configuration of increments with bracketed solution
+    for i in np.flatnonzero(found & (w1 != 1.0)):
+        f = incs[i]
+        gridN[...,f] = [1.0,1.0,w1[i]] * gridN[...,f]
+        mag = np.sqrt(np.sum(gridN[...,f]**2,3))
+        gridN[...,f] = gridN[...,f] / mag[...,None]
+
+        # Middle surface between front and back surfaces
+        gridX[...,f] = _subroutines.MidSurface(gridX[...,f],gridN[...,f])
+
+        # Reconstructed points through bezier curve
         eFEM['X'][...,f] = _subroutines.Bezier(gridX[...,f],gridZ[...,f])
 
         # Elements volume in deformed configuration
         eFEM['EVOL'][...,f] = _subroutines.Volume(eFEM['X'][...,f],
                                                   nny,nnx,nnz)
 
-        # Check when total volume stops evolving by elastic deformation
-        if elastic:
-            incs = np.arange(0,f+1)
+    return eFEM,gridX,gridN
 
-            vol0 = np.sum(eFEM['EVOL'][...,:f+1],(0,1,2))
-            vol1 = np.polyval(np.polyfit(incs,vol0,2),incs)
+def GlobalCorrection(f,eFEM,gridX,gridN,gridZ,pfit,nny,nnx,nnz,solver='lm'):
 
-            r2 = r2_score(vol1,vol0)
-            if r2 < 0.99:
-                elasf = f
-                elastic = False
+    # Volume of reference by linear regression
+    Vr = pfit[0]*f + pfit[-1]
 
-        # Check when total volume stops evolving approximately linearly
+    # Opimize surface normals components
+    # w0 = [1.0,1.0,1.0]
+    w0 = 1.0
+    if solver == 'lm':
+        opti = least_squares( Optimisation,
+                              x0=w0,
+                              method='lm',
+                              x_scale='jac',
+                              args=(gridX[...,f],gridN[...,f],gridZ[...,f],
+                                    Vr,nny,nnx,nnz))
+        w1 = opti.x[0]
+
+    # Find weight matching total volume of reference by Brent's method
+    elif solver == 'brent':
+        def func(w,idx):
+            return TotalVolume(w,gridX[...,f,None],gridN[...,f,None],
+                               gridZ[...,f,None],nny,nnx,nnz) - Vr
+
+        a,b,ga,gb,found = BracketRoot(func,1)
+        if found[0] and ga[0] != 0:
+            w1 = brentq(lambda w: func(np.array([w]),None)[0],a[0],b[0],
+                        xtol=1e-12,rtol=1e-12)
         else:
-            incs = np.arange(elasf,f+1)
-
-            if len(incs) <= 5:
-                continue
+            w1 = w0
 
-            vol0 = np.sum(eFEM['EVOL'][...,elasf:f+1],(0,1,2))
-            vol1 = np.polyval(np.polyfit(incs,vol0,1),incs)
-
-            r2 = r2_score(vol1,vol0)
-
-            if r2 >= 0.99:
-                correlation = True
+    # If solution improves, update configuration
+    if w1 != w0:
+        gridN[...,f] = [1.0,1.0,w1] * gridN[...,f]
+        mag = np.sqrt(np.sum(gridN[...,f]**2,3))
+        gridN[...,f] = gridN[...,f] / mag[...,None]
 
-            if correlation and r2 < 0.99:
-                incs = np.arange(elasf,f)
+        # Middle surface between front and back surfaces
+        gridX[...,f] = _subroutines.MidSurface(gridX[...,f],
+                                               gridN[...,f])
 
-                vol0 = np.sum(eFEM['EVOL'][...,elasf:f],(0,1,2))
-                pfit = np.polyfit(incs,vol0,1)
+        # Reconstructed points through bezier curve
+        eFEM['X'][...,f] = _subroutines.Bezier(gridX[...,f],
+                                               gridZ[...,f])
 
-                i = 1
-                for vol in vol0[::-1]:
-                    if np.polyval(pfit,f-i) > vol:
-                        linf = f - i
-                        break
-                    i += 1
+        # Elements volume in deformed configuration
+        eFEM['EVOL'][...,f] = _subroutines.Volume(eFEM['X'][...,f],
+                                                  nny,nnx,nnz)
 
-                correction = True
-                break
+    return eFEM['X'][...,f],eFEM['EVOL'][...,f],gridX[...,f],gridN[...,f]
 
-    if correction:
+def CumulativeFit(vol,start,deg):
+
+    nf = vol.size
+    m = nf - start
+
+    # Scaled increments and shifted volumes from start of window
+    x = np.arange(m)/max(m-1,1)
+    y = vol[start:] - vol[start]
+
+    # Running sums of moments of increments and volumes
+    Sx = np.cumsum(x[:,None]**np.arange(2*deg+1),0)
+    Sxy = np.cumsum(x[:,None]**np.arange(deg+1) * y[:,None],0)
+    Syy = np.cumsum(y**2)
+    n = Sx[:,0]
+
+    # Coefficient of determination of exactly fitted windows
+    r2 = np.full(nf,np.nan)
+    r2[start:] = 1.0
+
+    # Least squares fit of each window by normal equations
+    fit = n > deg + 1
+    k = np.arange(deg+1)
+    G = Sx[fit][:,k[:,None] + k[None,:]]
+    beta = np.linalg.solve(G,Sxy[fit][...,None])[...,0]
+
+    # Residual and fitted sum of squares of each window
+    ssfit = np.sum(beta*Sxy[fit],1)
+    ssres = np.maximum(Syy[fit] - ssfit,0)
+    sstot = ssfit - Sxy[fit,0]**2/n[fit]
+
+    # Coefficient of determination of fit wrt. observed volumes
+    with np.errstate(divide='ignore',invalid='ignore'):
+        r2[start:][fit] = np.where(sstot > 0,1 - ssres/sstot,
+                                   np.where(ssres > 0,0.0,1.0))
+
+    return r2
+
+def DetectCorrection(vol,tol=0.99):
+
+    nf = vol.size
+    incs = np.arange(nf)
+
+    # Check when total volume stops evolving by elastic deformation
+    r2 = CumulativeFit(vol,0,2)
+    elastic = np.flatnonzero(r2[1:] < tol) + 1
+    if elastic.size == 0:
+        return False,None,None
+    elasf = elastic[0]
+
+    # Check when total volume stops evolving approximately linearly
+    r2 = CumulativeFit(vol,elasf,1)
+    valid = incs - elasf + 1 > 5
+    correlation = np.flatnonzero(valid & (r2 >= tol))
+    if correlation.size == 0:
+        return False,None,None
+
+    decorrelation = np.flatnonzero(valid & (r2 < tol)
+                                   & (incs > correlation[0]))
+    if decorrelation.size == 0:
+        return False,None,None
+    f = decorrelation[0]
+
+    # Linear regression of total volume before decorrelation
+    pfit = np.polyfit(incs[elasf:f],vol[elasf:f],1)
+
+    # Last increment with total volume below linear regression
+    below = np.flatnonzero(np.polyval(pfit,incs[elasf:f]) > vol[elasf:f])
+    if below.size == 0:
+        return False,None,None
+    linf = elasf + below[-1]
+
+    return True,linf,pfit
+
+def GlobalVolume(eFEM,gridX,gridN,gridZ,nny,nnx,nnz,nf,processing,
+                 solver='lm',workers=None,chunksize=1,memory=None):
+
+    # Reconstruct middle surface, deformed configuration and elements volume
+    _subroutines.Reconstruct(gridX,gridZ,nny,nnx,nnz,nf,gridN,memory,
+                             eFEM['X'],eFEM['EVOL'],desc='Global Volume')
+
+    # Detect increments deviating from linear evolution of total volume
+    vol = np.sum(eFEM['EVOL'],(0,1,2))
+    correction,linf,pfit = DetectCorrection(vol)
+
+    # Correct all increments at once by batched root finding
+    if correction and solver == 'batch':
+        eFEM,gridX,gridN = BatchCorrection(np.arange(linf,nf),eFEM,
+                                           gridX,gridN,gridZ,pfit,
+                                           nny,nnx,nnz)
+
+    # Correct increments in parallel with results written in shared memory
+    elif correction and processing == 'shared':
+        arrays = {'eFEM': {'X': eFEM['X'],'EVOL': eFEM['EVOL']},
+                  'gridX': gridX,'gridN': gridN,'gridZ': gridZ}
+        _subroutines.SharedMap(GlobalCorrection,np.arange(linf,nf),
+                               arrays,workers,chunksize,
+                               desc='Global Volume',
+                               pfit=pfit,nny=nny,nnx=nnx,nnz=nnz,
+                               solver=solver)
+
+    elif correction:
         # Generate partial function of local volume
         func = partial(GlobalCorrection,eFEM=eFEM,
                                         gridX=gridX,gridZ=gridZ,gridN=gridN,
                                         pfit=pfit,
-                                        nny=nny,nnx=nnx,nnz=nnz)
+                                        nny=nny,nnx=nnx,nnz=nnz,
+                                        solver=solver)
 
         # in parallel processing
         if processing == 'parallel':
-            rec = p_map(func,np.arange(linf,nf),num_cpus=6,
-                        desc='Global Volume')
+            rec = _subroutines.ScheduleMap(func,np.arange(linf,nf),
+                                           workers,chunksize,
+                                           desc='Global Volume')
 
         # in sequential processing
         elif processing == 'sequential':
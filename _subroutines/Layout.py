@@ -0,0 +1,81 @@
+import numpy as np
+
+def Layout(array):
+    """
+    Storage layout of array of increments.
+
+    Parameters
+    ----------
+    array : (...,nf),array
+        Array with increments as last dimension.
+
+    Returns
+    -------
+    layout : str
+        'increment' if the increments are stored in contiguous blocks
+        (increment-major), 'trailing' otherwise.
+    """
+
+    if (array.ndim > 1) and (array.shape[-1] > 1) and \
+       (array.strides[-1] == max(array.strides)) and \
+       np.moveaxis(array,-1,0).flags.c_contiguous:
+        return 'increment'
+
+    return 'trailing'
+
+def Allocate(shape,layout='increment',fill=0.0):
+    """
+    Allocate array of increments in storage layout.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of array with increments as last dimension.
+    layout : str
+        Storage layout, increment (contiguous block of each increment) |
+        trailing (increments as fastest varying dimension).
+    fill : float
+        Initial value of array.
+
+    Returns
+    -------
+    array : shape,float
+        Array of increments, a view of an (nf,...) array if increment-major.
+    """
+
+    if layout == 'increment':
+        return np.moveaxis(np.full(shape[-1:] + shape[:-1],fill),0,-1)
+
+    return np.full(shape,fill)
+
+def ToLayout(array,layout='increment'):
+    """
+    Copy array of increments to storage layout if needed.
+
+    Parameters
+    ----------
+    array : (...,nf),array
+        Array with increments as last dimension.
+    layout : str
+        Storage layout, increment | trailing.
+
+    Returns
+    -------
+    array : (...,nf),array
+        Array in storage layout (same array if already in layout).
+
+    Notes
+    -----
+    Whatever the layout, arrays keep increments as last dimension, so that
+      array[...,f] selects increment f. In increment-major layout it is a
+      contiguous block, so that per-increment stages, reshapes and copies
+      to workers do not gather strided memory.
+    """
+
+    if Layout(array) == layout:
+        return array
+
+    if layout == 'increment':
+        return np.moveaxis(np.ascontiguousarray(np.moveaxis(array,-1,0)),0,-1)
+
+    return np.ascontiguousarray(array)
@@ -1,7 +1,32 @@
 import os
+import json
 import numpy as np
+from functools import partial
+from p_tqdm import p_map
 
-def LoadExperimental(name,zlims):
+def Manifest(files):
+    """
+    Describe experimental files by size and modification time.
+
+    Parameters
+    ----------
+    files : list of str
+        Paths of experimental files.
+
+    Returns
+    -------
+    manifest : list
+        Name, size and modification time of each file.
+    """
+
+    manifest = []
+    for file in files:
+        stat = os.stat(file)
+        manifest.append([os.path.basename(file),stat.st_size,stat.st_mtime_ns])
+
+    return manifest
+
+def LoadExperimental(name,zlims,cache=True):
     """
     Load experimental coordinates and displacements of two surfaces.
 
@@ -11,13 +36,15 @@ def LoadExperimental(name,zlims):
         Name of current project.
     zlims : (2,)
         Limits of regular grid in z-direction.
+    cache : bool
+        Store parsed files in binary cache and load it on later runs.
 
     Returns
     -------
     expX : (np,3,2),float
         Reference coordinates of experimental points.
     expU : (np,3,2,nf),float
-        Displacements of experimental points.
+        Displacements of experimental points (read-only if cached).
     nf : int
         Number of increments.
 
@@ -25,32 +52,74 @@ def LoadExperimental(name,zlims):
     -----
     np : int
         Number of experimental points.
+
+    The binary cache is stored in input/{name}/cache as memory-mapped npy
+      files and is rebuilt whenever the size or modification time of any
+      experimental file changes. Its manifest is removed before the files
+      are rewritten and replaced last, so that an interrupted rebuild is
+      never loaded.
     """
 
-    expX,expU = [],[]
+    # List coordinates and displacements files of both surfaces
+    files = []
     for surf in ['front','back']:
-        dir = f'input\\{name}\\{surf}'
-        fpref = f'{dir}\\{name}_{surf}'
-
-        # Load coordinates
-        file = f'{fpref}_X.csv'
-        expXsurf = np.loadtxt(file,skiprows=1,delimiter=';')
-        pts = expXsurf.shape[0]
-
-        expX.append(expXsurf)
-
-        # Load displacements
-        nf = len(os.listdir(f'{dir}')) - 1
-        expUsurf = np.zeros((pts,3,nf))
-
-        for i in range(nf):
-            file = f'{fpref}_U_{i}.csv'
-            expUsurf[...,i] = np.loadtxt(file,skiprows=1,delimiter=';')
-
-        expU.append(expUsurf)
-
-    expX = np.moveaxis(np.array(expX),[1,2,0],[0,1,2])
-    expU = np.moveaxis(np.array(expU),[1,2,0,3],[0,1,2,3])
+        dir = os.path.join('input',name,surf)
+        fpref = os.path.join(dir,f'{name}_{surf}')
+
+        nf = len(os.listdir(dir)) - 1
+
+        files.append([f'{fpref}_X.csv'] + [f'{fpref}_U_{i}.csv'
+                                           for i in range(nf)])
+
+    # Check if binary cache matches experimental files
+    cdir = os.path.join('input',name,'cache')
+    manifest = Manifest(files[0] + files[1])
+    try:
+        with open(os.path.join(cdir,'manifest.json'),'r') as f:
+            valid = cache and (json.load(f) == manifest)
+    except (OSError,ValueError):
+        valid = False
+
+    if valid:
+        expX = np.load(os.path.join(cdir,'expX.npy'))
+        expU = np.load(os.path.join(cdir,'expU.npy'),mmap_mode='r')
+
+    else:
+        # Parse experimental files in parallel
+        loadtxt = partial(np.loadtxt,skiprows=1,delimiter=';')
+        data = p_map(loadtxt,files[0] + files[1],desc='Load Experimental')
+
+        pts = data[0].shape[0]
+        expX = np.moveaxis(np.array([data[0],data[nf+1]]),[1,2,0],[0,1,2])
+
+        # Store displacements in memory-mapped file of invalidated cache
+        if cache:
+            os.makedirs(cdir,exist_ok=True)
+            try:
+                os.remove(os.path.join(cdir,'manifest.json'))
+            except FileNotFoundError:
+                pass
+            expU = np.lib.format.open_memmap(os.path.join(cdir,'expU.npy'),
+                                             mode='w+',shape=(pts,3,2,nf))
+        else:
+            expU = np.zeros((pts,3,2,nf))
+
+        for i in range(2):
+            for f in range(nf):
+                expU[:,:,i,f] = data[i*(nf+1) + f + 1]
+
+        # Flip back surface z displacements
+        expU[:,2,1,:] = -expU[:,2,1,:]
+
+        # Write manifest last and atomically so that incomplete caches are
+        # not valid
+        if cache:
+            expU.flush()
+            np.save(os.path.join(cdir,'expX.npy'),expX)
+            path = os.path.join(cdir,'manifest.json')
+            with open(f'{path}.tmp','w') as f:
+                json.dump(manifest,f)
+            os.replace(f'{path}.tmp',path)
 
     # Verify if all points have coordinates and displacements
 
@@ -62,7 +131,4 @@ def LoadExperimental(name,zlims):
     lmax = np.nanmax(expX[:,:2,:2],0)
     expX[:,:2,:2] = expX[:,:2,:2] - (lmin + lmax)/2
 
-    # Flip back surface z displacements
-    expU[:,2,1,:] = -expU[:,2,1,:]
-
-    return expX,expU,nf
\ No newline at end of file
+    return expX,expU,nf
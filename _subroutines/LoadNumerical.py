@@ -1,83 +1,255 @@
 import os
+import shutil
+import hashlib
 import numpy as np
 from scipy.interpolate import griddata
 
 import _subroutines
 
-def LoadNumerical(name,ylims,xlims,zlims,nny,nnx,nnz):
-
-    dir = f'input\\{name}\\fem'
+def CacheKey(files,xlims,ylims,zlims,nny,nnx,nnz):
+    """
+    Hash numerical files content and regular grid parameters.
+
+    Parameters
+    ----------
+    files : list of str
+        Paths of numerical files.
+    xlims : (2,)
+        Limits of regular grid in x-direction.
+    ylims : (2,)
+        Limits of regular grid in y-direction.
+    zlims : (2,)
+        Limits of regular grid in z-direction.
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal digest identifying cache entry.
+    """
+
+    sha = hashlib.sha256()
+
+    # Hash regular grid parameters
+    for lims in [xlims,ylims,zlims]:
+        sha.update(np.asarray(lims,dtype=float).tobytes())
+    sha.update(np.array([nny,nnx,nnz],dtype=np.int64).tobytes())
+
+    # Hash content of numerical files
+    for file in files:
+        sha.update(os.path.basename(file).encode())
+        with open(file,'rb') as f:
+            for block in iter(lambda: f.read(2**20),b''):
+                sha.update(block)
+
+    return sha.hexdigest()
+
+def EvictCache(cdir,cachesize):
+    """
+    Remove least recently used cache entries above maximum disk size.
+
+    Parameters
+    ----------
+    cdir : str
+        Directory of cache entries.
+    cachesize : int
+        Maximum disk size of cache in bytes.
+    """
+
+    # Disk size and last access of each cache entry
+    entries = []
+    for key in os.listdir(cdir):
+        edir = os.path.join(cdir,key)
+
+        # Skip temporary entries still being written
+        if key.endswith('.tmp') or not os.path.isdir(edir):
+            continue
+        size = sum(os.path.getsize(os.path.join(edir,file))
+                   for file in os.listdir(edir))
+        entries.append((os.path.getmtime(edir),size,edir))
+
+    # Remove oldest entries until cache fits maximum disk size
+    total = sum(entry[1] for entry in entries)
+    for _,size,edir in sorted(entries)[:-1]:
+        if total <= cachesize:
+            break
+        shutil.rmtree(edir,ignore_errors=True)
+        total -= size
+
+    return
+
+def ValidEntry(edir,keys):
+
+    # Cache entry with all arrays of results
+    return all(os.path.isfile(os.path.join(edir,f'{k}.npy')) for k in keys)
+
+def CommitEntry(edir,keys):
+    """
+    Move complete temporary entry to cache.
+
+    Parameters
+    ----------
+    edir : str
+        Directory of cache entry, written in temporary {edir}.tmp.
+    keys : list of str
+        Names of arrays of results of cache entry.
+
+    Notes
+    -----
+    A non-empty directory cannot be replaced. If another run has already
+      stored a valid entry, the temporary entry is discarded, otherwise
+      the stale entry (e.g. partially evicted) is removed before renaming.
+    """
 
     try:
-        data = np.load(f'{dir}\\{name}_Grid.npz')
-        gridX = data['arr_0']
-        gridU = data['arr_1']
-        gridLE = data['arr_2']
-        gridEVOL = data['arr_3']
-        gridVOL = data['arr_4']
-        # # Extract z coordinates
-        # gridZ = gridX[...,-1,:]
-
-        # # Compute min and max of z coordinates
-        # minZ = np.min(gridZ,2)
-        # maxZ = np.max(gridZ,2)
-
-        # # Compute normalised z coordinates
-        # gridZ = (gridZ-gridZ[...,None,:])/(gridZ[...,None,:]-gridZ[...,None,:])
-
-    except:
-        # Get number of increments
-        files = os.listdir(f'{dir}')
-        nf = 0
-        for file in files:
-            try:
-                if file.split('_')[-2] == 'U':
-                    nf = nf + 1
-            except:
-                pass
-
-        # Load nodal coordinates
-        numX = np.loadtxt(f'{dir}\\{name}_fem_X.csv',skiprows=1,delimiter=';')
-
-        # Translate xy origin to center of specimen
-        lmin = np.nanmin(numX,0)
-        lmax = np.nanmax(numX,0)
-        numX = numX - (lmin + lmax)/2
-
-        # Number of nodes
-        nn = numX.shape[0]
-
-        # Load nodal displacements
-        numU = np.zeros((nn,3,nf))
-        for f in range(nf):
-            numU[...,f] = np.loadtxt(f'{dir}\\{name}_fem_U_{f}.csv',
-                                     skiprows=1,delimiter=';')
-
-        # Generate xy grid coordinates
-        dx = np.linspace(xlims[0],xlims[1],nnx)
-        dy = np.linspace(ylims[1],ylims[0],nny)
-        dz = np.linspace(zlims[1],zlims[0],nnz)
-
-        # Generate xy regular grid
-        xx,yy,zz = np.meshgrid(dx,dy,dz)
-        grid = np.stack((xx,yy,zz),axis=3)
-
-        # Interpolate numerical displacements to regular grid
-        gridU = griddata(numX,numU,grid)
-
-        # Compute numerical coordinates on regular grid
-        gridX = grid[...,None] + gridU
-
-        # Compute logarithmic strain on regular grid
-        gridLE = _subroutines.LogStrain(gridX[...,0],gridU,nny,nnx,nnz,nf)
-
-        gridEVOL = np.zeros((nny-1,nnx-1,nnz-1,nf))
-        for f in range(nf):
-            gridEVOL[...,f] = _subroutines.Volume(gridX[...,f],nny,nnx,nnz)
-
-        gridVOL = (np.ones((nny-1,nnx-1,nnz-1,nf))
-                       * np.sum(gridEVOL,(0,1,2))[None,None,None,:])
-
-        np.savez(f'{dir}\\{name}_Grid',gridX,gridU,gridLE,gridEVOL,gridVOL)
+        os.replace(f'{edir}.tmp',edir)
+    except OSError:
+        if not os.path.isdir(edir):
+            raise
+        if ValidEntry(edir,keys):
+            shutil.rmtree(f'{edir}.tmp',ignore_errors=True)
+        else:
+            shutil.rmtree(edir)
+            os.replace(f'{edir}.tmp',edir)
+
+    return
+
+def LoadNumerical(name,ylims,xlims,zlims,nny,nnx,nnz,cachesize=2**32,
+                  memory=None):
+    """
+    Load numerical coordinates and results interpolated to regular grid.
+
+    Parameters
+    ----------
+    name : str
+        Name of current project.
+    ylims : (2,)
+        Limits of regular grid in y-direction.
+    xlims : (2,)
+        Limits of regular grid in x-direction.
+    zlims : (2,)
+        Limits of regular grid in z-direction.
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+    cachesize : int
+        Maximum disk size of cache in bytes.
+    memory : int
+        Memory budget in bytes of blocks of logarithmic strain computation.
+
+    Returns
+    -------
+    gridX : (nny,nnx,nnz,3,nf),float
+        Numerical coordinates on regular grid.
+    gridU : (nny,nnx,nnz,3,nf),float
+        Numerical displacements on regular grid.
+    gridLE : (ney,nex,nez,6,nf),float
+        Numerical logarithmic strain on regular grid.
+    gridEVOL : (ney,nex,nez,nf),float
+        Numerical elements volume on regular grid.
+    gridVOL : (ney,nex,nez,nf),float
+        Numerical global volume on regular grid.
+
+    Notes
+    -----
+    Results are cached in input/{name}/fem/cache under a hash of the
+      numerical files and regular grid parameters, loaded memory-mapped,
+      and least recently used entries are evicted above cachesize.
+    """
+
+    dir = os.path.join('input',name,'fem')
+    keys = ['gridX','gridU','gridLE','gridEVOL','gridVOL']
+
+    # Get number of increments
+    files = os.listdir(f'{dir}')
+    nf = 0
+    for file in files:
+        try:
+            if file.split('_')[-2] == 'U':
+                nf = nf + 1
+        except:
+            pass
+
+    # Cache entry of numerical files and regular grid parameters
+    files = ([os.path.join(dir,f'{name}_fem_X.csv')]
+             + [os.path.join(dir,f'{name}_fem_U_{f}.csv') for f in range(nf)])
+    key = CacheKey(files,xlims,ylims,zlims,nny,nnx,nnz)
+    cdir = os.path.join(dir,'cache')
+    edir = os.path.join(cdir,key)
+
+    # Load memory-mapped results from cache and update last access
+    if ValidEntry(edir,keys):
+        os.utime(edir)
+        return tuple(np.load(os.path.join(edir,f'{k}.npy'),mmap_mode='r')
+                     for k in keys)
+
+    # Load nodal coordinates
+    numX = np.loadtxt(files[0],skiprows=1,delimiter=';')
+
+    # Translate xy origin to center of specimen
+    lmin = np.nanmin(numX,0)
+    lmax = np.nanmax(numX,0)
+    numX = numX - (lmin + lmax)/2
+
+    # Number of nodes
+    nn = numX.shape[0]
+
+    # Load nodal displacements
+    numU = np.zeros((nn,3,nf))
+    for f in range(nf):
+        numU[...,f] = np.loadtxt(files[f+1],skiprows=1,delimiter=';')
+
+    # Generate xy grid coordinates
+    dx = np.linspace(xlims[0],xlims[1],nnx)
+    dy = np.linspace(ylims[1],ylims[0],nny)
+    dz = np.linspace(zlims[1],zlims[0],nnz)
+
+    # Generate xy regular grid
+    xx,yy,zz = np.meshgrid(dx,dy,dz)
+    grid = np.stack((xx,yy,zz),axis=3)
+
+    # Interpolate numerical displacements to regular grid
+    gridU = griddata(numX,numU,grid)
+
+    # Compute numerical coordinates on regular grid
+    gridX = grid[...,None] + gridU
+
+    # Compute logarithmic strain on regular grid in temporary entry
+    os.makedirs(f'{edir}.tmp',exist_ok=True)
+    gridLE = np.lib.format.open_memmap(os.path.join(f'{edir}.tmp',
+                                                    'gridLE.npy'),
+                                       mode='w+',
+                                       shape=(nny-1,nnx-1,nnz-1,6,nf))
+    gridLE = _subroutines.LogStrain(gridX[...,0],gridU,nny,nnx,nnz,nf,
+                                    fast=True,memory=memory,out=gridLE)
+    gridLE.flush()
+    del gridLE
+
+    gridEVOL = np.zeros((nny-1,nnx-1,nnz-1,nf))
+    for f in range(nf):
+        gridEVOL[...,f] = _subroutines.Volume(gridX[...,f],nny,nnx,nnz)
+
+    gridVOL = (np.ones((nny-1,nnx-1,nnz-1,nf))
+                   * np.sum(gridEVOL,(0,1,2))[None,None,None,:])
+
+    # Store results in temporary entry and move it to cache when complete
+    for k,data in zip(['gridX','gridU','gridEVOL','gridVOL'],
+                      [gridX,gridU,gridEVOL,gridVOL]):
+        np.save(os.path.join(f'{edir}.tmp',f'{k}.npy'),data)
+    CommitEntry(edir,keys)
+
+    # Load memory-mapped logarithmic strain from cache
+    gridLE = np.load(os.path.join(edir,'gridLE.npy'),mmap_mode='r')
+
+    # Evict least recently used entries above maximum disk size
+    EvictCache(cdir,cachesize)
 
     return gridX,gridU,gridLE,gridEVOL,gridVOL
@@ -1,27 +1,47 @@
+import numpy as np
+from functools import partial
+
 import _subroutines
 
-def LocalVolume(f,eFEM,gridX,gridZ,nny,nnx,nnz,reference,strategy,speed):
+def LocalVolume(f,eFEM,gridX,gridZ,nny,nnx,nnz,reference,strategy,speed,
+                refEVOL=None,seed=None):
 
     if reference == 'total':
         ref = 0
     elif reference == 'incremental':
         ref = f - 1
 
+    # Reference elements volume (predicted when given by increment)
+    if refEVOL is None:
+        recVr = eFEM['EVOL'][...,ref]
+    else:
+        recVr = refEVOL[...,f]
+
+    # Warm start from z distribution of seed increment
+    warm = seed is not None
+    if warm:
+        gridZ[...,f] = gridZ[...,seed]
+        eFEM['X'][...,f] = _subroutines.Bezier(gridX[...,f],gridZ[...,f])
+        eFEM['EVOL'][...,f] = _subroutines.Volume(eFEM['X'][...,f],
+                                                  nny,nnx,nnz)
+
     # Through optimization of logarithmic bias
     if strategy == 'bias':
-        gridZ[...,f] = _subroutines.BiasZ(gridX[...,f],gridZ[...,f],
-                                          eFEM['EVOL'][...,f],
-                                          eFEM['EVOL'][...,ref],
-                                          nny,nnx,nnz,
-                                          speed)
+        with _subroutines.Stage('BiasZ',f=int(f)):
+            gridZ[...,f] = _subroutines.BiasZ(gridX[...,f],gridZ[...,f],
+                                              eFEM['EVOL'][...,f],
+                                              recVr,
+                                              nny,nnx,nnz,
+                                              speed,warm)
 
     # Through direct optimization of each layer
     elif strategy == 'optimise':
-        gridZ[...,f] = _subroutines.OptimiseZ(gridX[...,f],gridZ[...,f],
-                                              eFEM['EVOL'][...,f],
-                                              eFEM['EVOL'][...,ref],
-                                              nny,nnx,nnz,
-                                              speed)
+        with _subroutines.Stage('OptimiseZ',f=int(f)):
+            gridZ[...,f] = _subroutines.OptimiseZ(gridX[...,f],gridZ[...,f],
+                                                  eFEM['EVOL'][...,f],
+                                                  recVr,
+                                                  nny,nnx,nnz,
+                                                  speed,warm)
 
     # Reconstruct undeformed configuration through bezier curve
     eFEM['X'][...,f] = _subroutines.Bezier(gridX[...,f],gridZ[...,f])
@@ -30,4 +50,165 @@ def LocalVolume(f,eFEM,gridX,gridZ,nny,nnx,nnz,reference,strategy,speed):
     eFEM['EVOL'][...,f] = _subroutines.Volume(eFEM['X'][...,f],
                                               nny,nnx,nnz)
 
-    return eFEM['X'][...,f],eFEM['EVOL'][...,f],gridZ[...,f]
\ No newline at end of file
+    return eFEM['X'][...,f],eFEM['EVOL'][...,f],gridZ[...,f]
+
+def VolumeError(EVOL,refEVOL):
+
+    # Maximum error along z of each column summed over elements inside
+    #   geometry in both volumes (as cost of local volume)
+    finite = np.isfinite(EVOL) & np.isfinite(refEVOL)
+    error = np.where(finite,abs(EVOL - refEVOL),0.0)
+
+    return np.sum(np.max(error,2),(0,1))
+
+def WarmVolume(f,**kwargs):
+
+    # Warm start from current z distribution of increment
+    return LocalVolume(f,seed=f,**kwargs)
+
+def IncrementalVolume(eFEM,gridX,gridZ,nny,nnx,nnz,nf,strategy,speed,
+                      processing='parallel',workers=None,chunksize=1,
+                      tol=0.25,maxiter=None):
+    """
+    Reconstruct increments wrt. previous increment in parallel by
+      speculative execution.
+
+    Parameters
+    ----------
+    eFEM : dict
+        Experimental finite element mesh.
+    gridX : (nny,nnx,3,3,nf),float
+        Regular grid surface coordinates.
+    gridZ : (nny,nnx,nnz,nf),float
+        Z-position of points along Bézier curves.
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+    nf : int
+        Number of increments.
+    strategy : str
+        Local volume strategy (bias | optimise).
+    speed : str
+        Local volume speed (fast | slow | colored).
+    processing : str
+        Parallel processing (parallel | shared).
+    workers : int
+        Number of worker processes. If None, detected from available cpus.
+    chunksize : int
+        Number of increments dispatched to a worker at once.
+    tol : float
+        Change of reference volume of an increment, relative to the error
+        of its speculative reconstruction against it, below which the
+        reconstruction is accepted. If 0, the sequential warm-started
+        reconstruction is reproduced.
+    maxiter : int
+        Maximum number of speculative rounds. If None, nf - 1.
+
+    Returns
+    -------
+    eFEM : dict
+        Experimental finite element mesh.
+    gridZ : (nny,nnx,nnz,nf),float
+        Z-position of points along Bézier curves.
+
+    Notes
+    -----
+    All increments are first reconstructed in parallel, each against the
+      undeformed volume as its predicted reference. Increments whose
+      reference changed are then reconstructed again against the volume
+      of the previous increment, warm started from its z distribution as
+      in the sequential reconstruction, until the references of all
+      increments are accepted.
+
+    Changes and errors are measured as the cost of the local correction
+      (maximum error along z of each column, summed over elements inside
+      the geometry). If the reference of an increment changed by less
+      than tol times the error of its reconstruction against it, its
+      error against the updated reference is at most (1 + tol) times the
+      error the optimiser left, so the change is within the accuracy of
+      the local correction. Warm and cold starts of the optimisers differ
+      by more than 0.25 times this error on the synthetic specimen.
+
+    If a round confirms only one increment or maxiter rounds are reached,
+      speculation gives no gain over the sequential reconstruction, which
+      then completes the remaining increments.
+    """
+
+    if maxiter is None:
+        maxiter = nf - 1
+
+    # Predicted reference volume of each increment as the undeformed volume
+    refEVOL = np.repeat(eFEM['EVOL'][...,:1],nf,-1)
+
+    # First round from initial z distribution of increments
+    func = LocalVolume
+
+    incs = np.arange(1,nf)
+    for it in range(maxiter):
+        desc = f'Local Volume ({it+1})'
+        _subroutines.Count('rounds')
+        _subroutines.Count('speculative',incs.size)
+
+        # in parallel processing with results written in shared memory
+        if processing == 'shared':
+            arrays = {'eFEM': {'X': eFEM['X'],'EVOL': eFEM['EVOL']},
+                      'gridX': gridX,'gridZ': gridZ,'refEVOL': refEVOL}
+            _subroutines.SharedMap(func,incs,arrays,
+                                   workers,chunksize,desc=desc,
+                                   nny=nny,nnx=nnx,nnz=nnz,
+                                   reference='incremental',
+                                   strategy=strategy,
+                                   speed=speed)
+
+        # in parallel processing
+        else:
+            task = partial(func,eFEM=eFEM,
+                                gridX=gridX,gridZ=gridZ,
+                                nny=nny,nnx=nnx,nnz=nnz,
+                                reference='incremental',
+                                strategy=strategy,
+                                speed=speed,
+                                refEVOL=refEVOL)
+            rec = _subroutines.ScheduleMap(task,incs,workers,chunksize,
+                                           desc=desc)
+
+            # Extract results from reconstruction
+            for i,f in enumerate(incs):
+                eFEM['X'][...,f] = rec[i][0]
+                eFEM['EVOL'][...,f] = rec[i][1]
+                gridZ[...,f] = rec[i][2]
+
+        # Change of reference volume of increments after updated ones and
+        #   error of their reconstruction against it
+        nxt = incs[incs < nf-1] + 1
+        change = VolumeError(eFEM['EVOL'][...,nxt-1],refEVOL[...,nxt])
+        error = VolumeError(eFEM['EVOL'][...,nxt],refEVOL[...,nxt])
+
+        # Elements outside geometry in only one of both volumes
+        outside = (np.isfinite(eFEM['EVOL'][...,nxt-1])
+                   != np.isfinite(refEVOL[...,nxt])).any((0,1,2))
+
+        done = incs.size
+        incs = nxt[(change > tol*error) | outside]
+        if incs.size == 0:
+            return eFEM,gridZ
+
+        # Complete sequentially if speculation confirms a single increment
+        if (it == maxiter - 1) or ((it > 0) and (incs.size >= done - 1)):
+            break
+
+        # Update reference volume and warm start from previous increment
+        refEVOL[...,incs] = eFEM['EVOL'][...,incs-1]
+        gridZ[...,incs] = gridZ[...,incs-1]
+        func = WarmVolume
+
+    # in sequential processing warm started from previous increment
+    _subroutines.Count('sequential',nf - incs[0])
+    for f in range(incs[0],nf):
+        LocalVolume(f,eFEM,gridX,gridZ,nny,nnx,nnz,'incremental',
+                    strategy,speed,seed=f-1 if f > 1 else None)
+
+    return eFEM,gridZ
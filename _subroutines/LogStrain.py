@@ -2,40 +2,127 @@ import numpy as np
 
 import _subroutines
 
-def LogStrain(coord,displ,nny,nnx,nnz,nf=None):
+def StrainChunks(ney,nex,nez,nf,memory,fast=False):
+    """
+    Split elements rows and increments in blocks within memory budget.
+
+    Parameters
+    ----------
+    ney : int
+        Number of elements of regular grid in y-direction.
+    nex : int
+        Number of elements of regular grid in x-direction.
+    nez : int
+        Number of elements of regular grid in z-direction.
+    nf : int
+        Number of increments.
+    memory : int
+        Memory budget of temporary arrays in bytes. If None, all elements
+        rows and increments are computed in one block.
+    fast : bool
+        Strain computed by symmetric eigendecomposition.
+
+    Returns
+    -------
+    chunks : list of tuple
+        Elements rows and increments slices of each block.
+
+    Notes
+    -----
+    Temporary arrays of one element and increment (displacements by
+      element, deformation gradient, decompositions and strain) take
+      about 64 floats with the eigendecomposition kernel and 128 floats
+      with the polar decomposition.
+    """
+
+    nfs = 1 if nf is None else nf
+    if memory is None:
+        return [(slice(0,ney),slice(0,nfs))]
+
+    # Estimated bytes of temporary arrays per element and increment
+    nbytes = 8 * (64 if fast else 128)
+
+    # Increments per block if a single elements row exceeds budget
+    row = nbytes * nex * nez
+    nfb = int(min(nfs,max(1,memory // row)))
+
+    # Elements rows per block with increments block
+    nyb = int(min(ney,max(1,memory // (row * nfb))))
+
+    chunks = []
+    for i0 in range(0,ney,nyb):
+        for f0 in range(0,nfs,nfb):
+            chunks.append((slice(i0,min(i0+nyb,ney)),
+                           slice(f0,min(f0+nfb,nfs))))
+
+    return chunks
+
+def LogStrain(coord,displ,nny,nnx,nnz,nf=None,fast=False,memory=None,
+              out=None):
     """
     Compute the logarithmic strain in global csys by the polar 
       decomposition of the deformation gradient.
 
     Parameters
     ----------
-    coord : (ne,8,3),float
-        Reference nodal coordinates.
-    displ : (ne,8,3),float
-        Nodal displacements in deformed configuration.
+    coord : (nny,nnx,nnz,3),float
+        Reference nodal coordinates on regular grid.
+    displ : (nny,nnx,nnz,3) or (nny,nnx,nnz,3,nf),float
+        Nodal displacements on regular grid in deformed configuration(s).
     nny : int
         Number of nodes of regular grid in y-direction.
     nnx : int
         Number of nodes of regular grid in x-direction.
     nnz : int
         Number of nodes of regular grid in z-direction.
+    nf : int
+        Number of increments.
+    fast : bool
+        Compute strain by one symmetric eigendecomposition of F F'.
+    memory : int
+        Memory budget in bytes of blocks of elements rows and increments.
+        If None, all elements and increments are computed at once.
+    out : (ney,nex,nez,6) or (ney,nex,nez,6,nf),float
+        Preallocated strain, e.g. memory-mapped, written block by block.
 
     Returns
     -------
-    strain : (ney,nex,nez,6),float
-        Logarithmic strain in global csys.
-    evol : (ney,nex,nez),float
-        Elements volume.
+    strain : (ney,nex,nez,6) or (ney,nex,nez,6,nf),float
+        Logarithmic strain in global csys (out if given).
 
     Notes
     -----
-    ne : int
-        Number of elements.
+    With a memory budget or out, the function calls itself on blocks of
+      elements rows (with the shared row of nodes) and increments from
+      StrainChunks, each reshaped by element through ReshapeMesh.
     """
 
     # Number of elements
     ney,nex,nez = nny-1,nnx-1,nnz-1
 
+    # Compute strain by blocks of elements rows and increments
+    if memory is not None or out is not None:
+        if out is None and nf is None:
+            out = np.zeros((ney,nex,nez,6))
+        elif out is None:
+            out = _subroutines.Allocate((ney,nex,nez,6,nf),
+                                        _subroutines.Layout(displ))
+
+        for rows,incs in StrainChunks(ney,nex,nez,nf,memory,fast):
+            nodes = slice(rows.start,rows.stop+1)
+            nyb = rows.stop - rows.start + 1
+
+            if nf is None:
+                out[rows,...] = LogStrain(coord[nodes,...],displ[nodes,...],
+                                          nyb,nnx,nnz,fast=fast)
+            else:
+                nfb = incs.stop - incs.start
+                out[rows,...,incs] = LogStrain(coord[nodes,...],
+                                               displ[nodes,...,incs],
+                                               nyb,nnx,nnz,nfb,fast=fast)
+
+        return out
+
     # Reshape reference coordinates by element
     coord = _subroutines.ReshapeMesh(coord,nny,nnx,nnz)
 
@@ -48,15 +135,20 @@ def LogStrain(coord,displ,nny,nnx,nnz,nf=None):
     # Deformaton gradient
     dfgrd = _subroutines.DefGrad(displ,dNdNr,jac)
 
-    # Polar decomposition of deformation gradient
-    strch = _subroutines.PolarDecomposition(dfgrd,side='left')
+    # Logarithmic strain in voigt notation by symmetric eigendecomposition
+    if fast:
+        strain = _subroutines.EigenStrain(dfgrd,nf)
+
+    else:
+        # Polar decomposition of deformation gradient
+        strch = _subroutines.PolarDecomposition(dfgrd,side='left')
 
-    # Logarithmic strain in global csys
-    eigv,eigpr = np.linalg.eig(strch)
-    strain = eigpr * np.log(eigv[...,None,:]) @ np.linalg.inv(eigpr)
+        # Logarithmic strain in global csys
+        eigv,eigpr = np.linalg.eig(strch)
+        strain = eigpr * np.log(eigv[...,None,:]) @ np.linalg.inv(eigpr)
 
-    # Convert strain tensor to voigt notation
-    strain = _subroutines.TensorToVoigt(strain,nf)
+        # Convert strain tensor to voigt notation
+        strain = _subroutines.TensorToVoigt(strain,nf)
 
     # Reshape strain to regular grid
     if nf is None:
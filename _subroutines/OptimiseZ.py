@@ -1,27 +1,107 @@
 import numpy as np
-from scipy.signal import savgol_filter
 from scipy.optimize import Bounds, minimize, differential_evolution
 
-
 import _subroutines
 
-def Optimisation(w,Xij,Zij,Vij,nnz):
+def Optimisation(w,Xij,Zij,Vij,nnz,invariants=None):
 
-    # Update z distribution of node ij
-    optiZ = np.copy(Zij)
-    optiZ[1,1,1:int(nnz/2)] = w
-    optiZ[1,1,int(nnz/2)+1:-1] = 1 - np.flip(w)
+    # Compute elements volume from z distribution of node ij and invariants
+    if invariants is not None:
+        optiZ = GenerateZ(w,Zij[1,1,:],nnz)
+        optiV = _subroutines.PatchVolume(optiZ,invariants)
 
-    # Reconstruct coordinates in deformed configuration
-    optiX = _subroutines.Bezier(Xij,optiZ)
+    else:
+        # Update z distribution of node ij
+        optiZ = np.copy(Zij)
+        optiZ[1,1,1:int(nnz/2)] = w
+        optiZ[1,1,int(nnz/2)+1:-1] = 1 - np.flip(w)
 
-    # Compute elements volume
-    optiV = _subroutines.Volume(optiX,3,3,nnz)
+        # Compute elements volume of reconstructed coordinates
+        optiV = _subroutines.BezierVolume(Xij,optiZ,3,3,nnz)
 
     # Compute individual cost function
     return np.nansum(np.max(abs(optiV - Vij),2))
 
-def OptimiseZ(gridX,gridZ,recV,recVr,nny,nnx,nnz,speed):
+def OptimisationGradient(w,Xij,Zij,Vij,nnz,invariants=None):
+
+    # Update z distribution of node ij
+    optiZ = np.copy(Zij)
+    optiZ[1,1,:] = GenerateZ(w,Zij[1,1,:],nnz)
+
+    # Derivatives of z distribution of node ij wrt. weights
+    nw = w.size
+    dZdw = np.zeros((nnz,nw))
+    dZdw[1:int(nnz/2),:] = np.identity(nw)
+    dZdw[int(nnz/2)+1:-1,:] = -np.flip(np.identity(nw),0)
+
+    # Compute individual cost function and its gradient
+    return _subroutines.CostGradient(Xij,optiZ,dZdw,Vij,nnz,invariants)
+
+def GenerateZ(w,Zc,nnz):
+
+    # Update z distribution of nodes symmetrically from weights
+    optiZ = np.copy(Zc)
+    optiZ[...,1:int(nnz/2)] = w
+    optiZ[...,int(nnz/2)+1:-1] = 1 - np.flip(w,-1)
+
+    return optiZ
+
+def ColoredOptimisation(maskX,maskZ,maskVr,nny,nnx,nnz,lb,ub,
+                        tol=1e-6,maxiter=100):
+
+    # Number of z positions optimised at each node
+    n = int(nnz/2)
+    nw = n - 1
+
+    # Optimise all nodes of each color at once
+    for I,J in _subroutines.NodeColors(nny,nnx):
+        nc = I.size
+
+        # Patches of nodes of color
+        Xc,Zc,Vc = _subroutines.NodePatches(I,J,maskX,maskZ[...,0],maskVr)
+        Zn = Zc[:,1,1,:]
+        args = (Xc,Zc,Vc,nnz,_subroutines.PatchInvariants(Xc,Zc))
+
+        # Bounds of nodes of color
+        lbc,ubc = lb[I,J],ub[I,J]
+
+        # Initial solution from current z distribution
+        w = np.clip(Zn[:,1:n],lbc,ubc)
+        cost = _subroutines.BatchCost(GenerateZ(w,Zn,nnz),*args)
+        _subroutines.CountNodes('calls',I-1,J-1,(nny,nnx))
+        _subroutines.CountNodes('nfev',I-1,J-1,(nny,nnx))
+
+        # Batched compass search within bounds
+        step = np.max(ubc - lbc,1)/4
+        for it in range(maxiter):
+            if np.all(step <= tol):
+                break
+
+            active = step > tol
+            improved = np.zeros(nc,dtype=bool)
+            for d in range(nw):
+                for sign in [1,-1]:
+                    wt = np.copy(w)
+                    wt[:,d] = np.clip(w[:,d] + sign*step,lbc[:,d],ubc[:,d])
+
+                    ct = _subroutines.BatchCost(GenerateZ(wt,Zn,nnz),*args)
+                    _subroutines.CountNodes('nfev',I-1,J-1,(nny,nnx))
+
+                    # Accept trial weights of nodes that improved
+                    better = np.logical_and(active,ct < cost)
+                    w[better] = wt[better]
+                    cost[better] = ct[better]
+                    improved[better] = True
+
+            # Reduce step of nodes that did not improve
+            step[~improved] = step[~improved]/2
+
+        # Update z distribution of nodes of color
+        maskZ[I,J,:,0] = GenerateZ(w,Zn,nnz)
+
+    return maskZ
+
+def OptimiseZ(gridX,gridZ,recV,recVr,nny,nnx,nnz,speed,warm=False):
 
     # Number of elements
     ney,nex,nez = nny-1,nnx-1, nnz-1
@@ -43,7 +123,13 @@ def OptimiseZ(gridX,gridZ,recV,recVr,nny,nnx,nnz,speed):
     # Initial linear solution and bounds
     dw = 0.5/int(nnz-1)
     w0 = np.linspace(0,0.5,int((nnz+1)/2))[1:-1]
-    bounds = Bounds(w0 - dw,w0 + dw)
+    W0 = np.broadcast_to(w0,(nny+2,nnx+2,w0.size))
+    lb,ub = W0 - dw,W0 + dw
+
+    # Initial solution of nodes from seeded z distribution and bounds around
+    if warm:
+        W0 = np.copy(maskZ[...,1:int(nnz/2),0])
+        lb,ub = np.clip(W0 - dw,0,0.5),np.clip(W0 + dw,0,0.5)
 
     # Initialize while loop control variables
     it = 0
@@ -51,48 +137,65 @@ def OptimiseZ(gridX,gridZ,recV,recVr,nny,nnx,nnz,speed):
 
     # print(f'\nIteration: {it} ({cost/ne:.8f})')
     while True:
-        for i in range(1,nny + 1):
-            i0,i1 = i-1,i+2
-            for j in range(1,nnx + 1):
-                j0,j1 = j-1,j+2
-
-                if speed == 'slow':
-                    opti = differential_evolution( Optimisation,
-                                            x0=w0,
-                                            bounds=bounds,
-                                            mutation=0.5,
-                                            args=(maskX[i0:i1,j0:j1,...],
-                                                  maskZ[i0:i1,j0:j1,:,0],
-                                                  maskVr[i0:i1-1,j0:j1-1,:],
-                                                  nnz))
-
-                elif speed == 'fast':
-                    opti = minimize( Optimisation,
-                                     x0=w0,
-                                     bounds=bounds,
-                                     method='SLSQP',
-                                     options={'fatol': 1e-8},
-                                     args=(maskX[i0:i1,j0:j1,...],
-                                           maskZ[i0:i1,j0:j1,:,0],
-                                           maskVr[i0:i1-1,j0:j1-1,:],
-                                           nnz)
-                                    )
-
-                # Check if individual solution improved
-                w1 = opti.x
-                if (w0 != w1).any():
-                    maskZ[i,j,1:int(nnz/2),0] = w1
-                    maskZ[i,j,int(nnz/2)+1:-1,0] = 1 - np.flip(w1)
-
-        # Smooth z-bias in x-direction
-        for i in range(1,nny + 1):
-            for k in range(1,nnz - 1):
-                maskZ[i,1:-1,k,0] = savgol_filter(maskZ[i,1:-1,k,0],nnx,2)
-
-        # Smooth z-bias in y-direction
-        for j in range(1,nnx + 1):
-            for k in range(1,nnz - 1):
-                maskZ[1:-1,j,k,0] = savgol_filter(maskZ[1:-1,j,k,0],nny,2)
+        # Optimise independent nodes of each color at once
+        if speed == 'colored':
+            maskZ = ColoredOptimisation(maskX,maskZ,maskVr,nny,nnx,nnz,
+                                        lb,ub)
+
+        # Optimise each node sequentially
+        else:
+            for i in range(1,nny + 1):
+                i0,i1 = i-1,i+2
+                for j in range(1,nnx + 1):
+                    j0,j1 = j-1,j+2
+
+                    # Initial solution and bounds of node ij
+                    w0 = W0[i,j]
+                    bounds = Bounds(lb[i,j],ub[i,j])
+
+                    # Terms of patch independent of node ij
+                    inv = _subroutines.PatchInvariants(maskX[i0:i1,j0:j1,...],
+                                                       maskZ[i0:i1,j0:j1,:,0])
+
+                    if speed == 'slow':
+                        opti = differential_evolution( Optimisation,
+                                                x0=w0,
+                                                bounds=bounds,
+                                                mutation=0.5,
+                                                args=(maskX[i0:i1,j0:j1,...],
+                                                      maskZ[i0:i1,j0:j1,:,0],
+                                                      maskVr[i0:i1-1,
+                                                             j0:j1-1,:],
+                                                      nnz,inv))
+
+                    elif speed == 'fast':
+                        opti = minimize( OptimisationGradient,
+                                         x0=w0,
+                                         jac=True,
+                                         bounds=bounds,
+                                         method='SLSQP',
+                                         options={'fatol': 1e-8},
+                                         args=(maskX[i0:i1,j0:j1,...],
+                                               maskZ[i0:i1,j0:j1,:,0],
+                                               maskVr[i0:i1-1,j0:j1-1,:],
+                                               nnz,inv)
+                                        )
+
+                    # Count optimiser calls and cost evaluations of node
+                    _subroutines.CountNodes('calls',i-1,j-1,(nny,nnx))
+                    _subroutines.CountNodes('nfev',i-1,j-1,(nny,nnx),
+                                            opti.nfev)
+
+                    # Check if individual solution improved
+                    w1 = opti.x
+                    if (w0 != w1).any():
+                        maskZ[i,j,1:int(nnz/2),0] = w1
+                        maskZ[i,j,int(nnz/2)+1:-1,0] = 1 - np.flip(w1)
+
+        _subroutines.Count('sweeps')
+
+        # Smooth z-bias in x and y directions
+        maskZ = _subroutines.SmoothZ(maskZ,nny,nnx,nnz)
 
         # Reconstruct coordinates in deformed configuration
         itX = _subroutines.Bezier(gridX,maskZ[1:-1,1:-1,:,0])
@@ -0,0 +1,119 @@
+import numpy as np
+
+import _subroutines
+
+# Signs of elements corners in rows of jacobian matrix (8 * dNdNr)
+SIGNS = np.array([[-1, 1, 1,-1,-1, 1, 1,-1],
+                  [-1,-1,-1,-1, 1, 1, 1, 1],
+                  [ 1, 1,-1,-1, 1, 1,-1,-1]],dtype=float)
+
+# Corners of elements of 2x2 patch at node in bottom/top z layers
+LO = np.array([[1,0],[5,4]])
+HI = np.array([[2,3],[6,7]])
+
+def PatchInvariants(Xij,Zij):
+    """
+    Precompute terms of elements volume of patch independent of its node.
+
+    Parameters
+    ----------
+    Xij : (...,3,3,3,3),float
+        Surface coordinates of 3x3 patch of node.
+    Zij : (...,3,3,nnz),float
+        Z-position of points along Bézier curves of 3x3 patch of node.
+
+    Returns
+    -------
+    invariants : tuple
+        Surface coordinates of node (...,3,3), fixed part of rows of
+        jacobian matrix of 2x2 elements (...,3,2,2,nez,3) and signs of
+        node in bottom and top corners of each element (3,2,2).
+
+    Theory
+    ------
+    Each row r of the (unscaled) jacobian matrix of an element is a signed
+      sum of its corners J_r = sum_c S[r,c] X_c. Only the bottom and top
+      corners of each element of the 2x2 patch lie on the node, so
+
+        J_r[a,b,k] = F_r[a,b,k] + S[r,lo] P[k] + S[r,hi] P[k+1],
+
+      with F_r the sum over the corners of the 8 other columns, fixed
+      while the node is optimised, and P the points of the node.
+    """
+
+    nnz = Zij.shape[-1]
+    nez = nnz-1
+
+    # Reconstructed points of patch without node
+    optiX = _subroutines.Bezier(Xij,Zij)
+    optiX[...,1,1,:,:] = 0.0
+
+    # Fixed part of rows of jacobian matrix
+    batch = Xij.shape[:-4]
+    F = np.zeros(batch + (3,2,2,nez,3))
+    for c in range(8):
+        corner = optiX[...,_subroutines.CY[c]:_subroutines.CY[c]+2,
+                           _subroutines.CX[c]:_subroutines.CX[c]+2,
+                           _subroutines.CZ[c]:_subroutines.CZ[c]+nez,:]
+        F = F + SIGNS[:,c,None,None,None,None] * corner[...,None,:,:,:,:]
+
+    return Xij[...,1,1,:,:],F,SIGNS[:,LO],SIGNS[:,HI]
+
+def PatchVolume(Zn,invariants,gradient=False):
+    """
+    Compute elements volume of patch from z-position of its node.
+
+    Parameters
+    ----------
+    Zn : (...,nnz),float
+        Z-position of points along Bézier curve of node.
+    invariants : tuple
+        Invariants of patch from PatchInvariants.
+    gradient : bool
+        Also return derivatives of elements volume wrt. z-position.
+
+    Returns
+    -------
+    evol : (...,2,2,nez),float
+        Volume of 2x2 elements of node.
+    dVdz : (...,2,2,nez,nnz),float
+        Derivatives of elements volume wrt. z-position, if gradient.
+    """
+
+    Xn,F,slo,shi = invariants
+    nnz = Zn.shape[-1]
+
+    # Points of node along bezier curve
+    z = Zn[...,None]
+    P = ((1-z)**2*Xn[...,None,0,:] + 2*(1-z)*z*Xn[...,None,1,:]
+         + z**2*Xn[...,None,-1,:])
+
+    # Rows of jacobian matrix of elements
+    P0 = P[...,None,None,None,:-1,:]
+    P1 = P[...,None,None,None,1:,:]
+    J = F + slo[...,None,None]*P0 + shi[...,None,None]*P1
+    J0,J1,J2 = J[...,0,:,:,:,:],J[...,1,:,:,:,:],J[...,2,:,:,:,:]
+
+    # Triple product of rows of jacobian matrix
+    cof0 = np.cross(J1,J2)
+    evol = np.sum(J0*cof0,-1)/64.0
+
+    if not gradient:
+        return evol
+
+    # Derivatives of elements volume wrt. bottom/top points of node
+    cof = np.stack((cof0,np.cross(J2,J0),np.cross(J0,J1)),-5)
+    dVdlo = np.sum(slo[...,None,None]*cof,-5)/64.0
+    dVdhi = np.sum(shi[...,None,None]*cof,-5)/64.0
+
+    # Derivatives of points of node wrt. z-position
+    dPdz = (2*(z-1)*Xn[...,None,0,:] + 2*(1-2*z)*Xn[...,None,1,:]
+            + 2*z*Xn[...,None,-1,:])
+
+    # Derivatives of elements volume wrt. z-position of node
+    k = np.arange(nnz-1)
+    dVdz = np.zeros(evol.shape + (nnz,))
+    dVdz[...,k,k] = np.sum(dVdlo*dPdz[...,None,None,:-1,:],-1)
+    dVdz[...,k,k+1] = np.sum(dVdhi*dPdz[...,None,None,1:,:],-1)
+
+    return evol,dVdz
@@ -0,0 +1,284 @@
+import os
+import sys
+import csv
+import json
+import time
+import tracemalloc
+import numpy as np
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Profile of current process (None if disabled), enabled by IMG_PROFILE
+#   environment variable as time (wall/cpu time and peak rss) or memory
+#   (also peak traced allocations, including numpy arrays)
+PROFILE = None
+
+# Shared context of disabled stages
+DISABLED = nullcontext()
+
+def EnableProfile(mode='time'):
+    """
+    Enable profiling of current process and discard previous records.
+
+    Parameters
+    ----------
+    mode : str
+        Profiling mode, time | memory. None disables profiling.
+    """
+
+    global PROFILE
+
+    if mode is None:
+        PROFILE = None
+        return
+
+    PROFILE = {'mode': mode,'records': [],'stack': [],'origin': time.time()}
+
+    # Trace allocations of python and numpy memory
+    if (mode == 'memory') and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    return
+
+def Profiling():
+
+    return None if PROFILE is None else PROFILE['mode']
+
+def PeakRSS():
+
+    # Peak resident set size of process in bytes
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else 1024*rss
+
+    try:
+        import psutil
+        return getattr(psutil.Process().memory_info(),'peak_wset',None)
+    except ImportError:
+        return None
+
+def Stage(name,**info):
+    """
+    Context of pipeline stage recorded in profile of current process.
+
+    Parameters
+    ----------
+    name : str
+        Name of stage.
+    **info
+        Further fields of record (e.g. increment f), inherited by nested
+        stages.
+
+    Returns
+    -------
+    context : context manager
+        Recording context, or shared empty context if profiling is
+        disabled.
+
+    Notes
+    -----
+    Each record holds the wall and cpu time of the stage, the peak rss of
+      the process at its end, the peak traced allocations above the start
+      of the stage (memory mode) and the counters of nested calls of Count
+      and CountNodes.
+    """
+
+    if PROFILE is None:
+        return DISABLED
+
+    return Record(name,info)
+
+@contextmanager
+def Record(name,info):
+
+    stack = PROFILE['stack']
+    parent = stack[-1] if stack else None
+
+    # Fields of stage inherited by nested stages
+    fields = {**parent['fields'],**info} if parent else dict(info)
+    record = {'name': name,
+              'path': f'{parent["path"]}/{name}' if parent else name,
+              **fields,
+              'pid': os.getpid(),
+              'start': time.time(),
+              'fields': fields,
+              'counters': {}}
+
+    # Peak of traced allocations of parent up to start of stage
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current,peak = tracemalloc.get_traced_memory()
+        for frame in stack:
+            frame['peak'] = max(frame['peak'],peak)
+        tracemalloc.reset_peak()
+        record['base'],record['peak'] = current,current
+
+    stack.append(record)
+    wall,cpu = time.perf_counter(),time.process_time()
+    try:
+        yield record
+
+    finally:
+        record['wall'] = time.perf_counter() - wall
+        record['cpu'] = time.process_time() - cpu
+        record['rss'] = PeakRSS()
+
+        # Peak of traced allocations above start of stage
+        if tracing:
+            peak = max(record.pop('peak'),tracemalloc.get_traced_memory()[1])
+            record['alloc'] = peak - record.pop('base')
+            for frame in stack[:-1]:
+                frame['peak'] = max(frame['peak'],peak)
+
+        stack.pop()
+        PROFILE['records'].append(record)
+
+def Count(key,n=1):
+    """
+    Add to counter of current stage.
+
+    Parameters
+    ----------
+    key : str
+        Name of counter.
+    n : int
+        Count to add.
+    """
+
+    if (PROFILE is None) or not PROFILE['stack']:
+        return
+
+    counters = PROFILE['stack'][-1]['counters']
+    counters[key] = counters.get(key,0) + n
+
+    return
+
+def CountNodes(key,I,J,shape,n=1):
+    """
+    Add to counter of nodes of regular grid in current stage.
+
+    Parameters
+    ----------
+    key : str
+        Name of counter.
+    I,J : int or (nc,),int
+        Indices of nodes in y and x directions.
+    shape : tuple
+        Shape (nny,nnx) of regular grid.
+    n : int or (nc,),int
+        Count to add to each node.
+    """
+
+    if (PROFILE is None) or not PROFILE['stack']:
+        return
+
+    counters = PROFILE['stack'][-1]['counters']
+    if key not in counters:
+        counters[key] = np.zeros(shape,dtype=int)
+    np.add.at(counters[key],(I,J),n)
+
+    return
+
+def CollectProfile():
+    """
+    Remove and return records of current process, e.g. to send records of
+      worker process to parent.
+
+    Returns
+    -------
+    records : list of dict
+        Records of completed stages.
+    """
+
+    if PROFILE is None:
+        return []
+
+    records = PROFILE['records']
+    PROFILE['records'] = []
+
+    return records
+
+def MergeProfile(records):
+    """
+    Merge records of worker processes into profile of current stage.
+
+    Parameters
+    ----------
+    records : list of dict
+        Records of completed stages of workers.
+    """
+
+    if PROFILE is None:
+        return
+
+    stack = PROFILE['stack']
+    for record in records:
+        if stack:
+            record = {**stack[-1]['fields'],**record,
+                      'path': f'{stack[-1]["path"]}/{record["path"]}'}
+        PROFILE['records'].append(record)
+
+    return
+
+def ReportProfile(dir):
+    """
+    Export profile of current process next to output files.
+
+    Parameters
+    ----------
+    dir : str
+        Directory of project to export output files.
+
+    Notes
+    -----
+    The json report holds every record with counters of nodes as nested
+      lists, and the csv report one row per record with node counters
+      summed over nodes. Records of stages are ordered by start time,
+      measured by the system clock to compare stages of worker processes.
+      Reported records are discarded from the profile.
+    """
+
+    if PROFILE is None:
+        return
+
+    # Start of stages of all processes relative to start of profile
+    origin = PROFILE['origin']
+    records = [{**r,'start': r['start'] - origin}
+               for r in sorted(PROFILE['records'],key=lambda r: r['start'])]
+    for record in records:
+        record.pop('fields',None)
+
+    outF = os.path.join('output',dir,dir)
+
+    # Export records with counters of nodes
+    data = [{**r,'counters': {k: np.asarray(v).tolist()
+                              for k,v in r['counters'].items()}}
+            for r in records]
+    with open(f'{outF}_profile.json','w') as f:
+        json.dump({'mode': PROFILE['mode'],'records': data},f,indent=1,
+                  default=lambda v: np.asarray(v).tolist())
+
+    # Export records with total counters
+    keys = ['path','name','f','pid','start','wall','cpu','rss','alloc']
+    counters = sorted({k for r in records for k in r['counters']})
+    with open(f'{outF}_profile.csv','w',newline='') as f:
+        w = csv.writer(f,delimiter=';')
+        w.writerow(keys + counters)
+        for r in records:
+            w.writerow([r.get(k,'') for k in keys]
+                       + [np.sum(r['counters'][k]) if k in r['counters']
+                          else '' for k in counters])
+
+    # Discard reported records
+    PROFILE['records'] = []
+
+    return
+
+# Enable profiling from environment of process
+if os.environ.get('IMG_PROFILE'):
+    EnableProfile('memory' if os.environ['IMG_PROFILE'] == 'memory'
+                  else 'time')
@@ -0,0 +1,117 @@
+import numpy as np
+from tqdm import tqdm
+
+import _subroutines
+
+def ReconstructChunks(nny,nnx,nnz,nf,memory):
+    """
+    Split increments in blocks within memory budget.
+
+    Parameters
+    ----------
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+    nf : int
+        Number of increments.
+    memory : int
+        Memory budget of temporary arrays in bytes. If None, all increments
+        are reconstructed in one block.
+
+    Returns
+    -------
+    chunks : list of slice
+        Increments of each block.
+
+    Notes
+    -----
+    Temporary arrays of one increment take about 15 floats per node
+      (repeated z-position and terms of Bézier curves) and 64 floats per
+      element (corners, shape functions derivatives and jacobian).
+    """
+
+    if memory is None:
+        return [slice(0,nf)]
+
+    # Estimated bytes of temporary arrays per increment
+    nbytes = 8 * (15*nny*nnx*nnz + 64*(nny-1)*(nnx-1)*(nnz-1))
+    nfb = int(min(nf,max(1,memory // nbytes)))
+
+    return [slice(f0,min(f0+nfb,nf)) for f0 in range(0,nf,nfb)]
+
+def Reconstruct(gridX,gridZ,nny,nnx,nnz,nf,gridN=None,memory=None,
+                recX=None,evol=None,desc=None):
+    """
+    Reconstruct deformed configuration of all increments at once.
+
+    Parameters
+    ----------
+    gridX : (nny,nnx,3,3,nf),float
+        Regular grid surface coordinates.
+    gridZ : (nny,nnx,nnz,nf),float
+        Z-position of points along Bézier curves.
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+    nf : int
+        Number of increments.
+    gridN : (nny,nnx,2,3,nf),float
+        Regular grid surface normals. If given, the middle surface of gridX
+        is computed first (in place).
+    memory : int
+        Memory budget of temporary arrays in bytes. If None, all increments
+        are reconstructed in one block.
+    recX : (nny,nnx,nnz,3,nf),float
+        Array of reconstructed points to write into (e.g. eFEM['X']).
+    evol : (ney,nex,nez,nf),float
+        Array of elements volume to write into (e.g. eFEM['EVOL']).
+    desc : str
+        Description of progress bar over blocks, hidden if None.
+
+    Returns
+    -------
+    recX : (nny,nnx,nnz,3,nf),float
+        Reconstructed points on regular grid.
+    evol : (ney,nex,nez,nf),float
+        Volume of reconstructed elements on regular grid.
+
+    Notes
+    -----
+    The middle surface, Bézier curves and elements volume broadcast over
+      a leading batch dimension, so each block of increments is computed
+      in one pass through views with increments first.
+    """
+
+    # Results in storage layout of regular grid
+    layout = _subroutines.Layout(gridX)
+    if recX is None:
+        recX = _subroutines.Allocate((nny,nnx,nnz,3,nf),layout)
+    if evol is None:
+        evol = _subroutines.Allocate((nny-1,nnx-1,nnz-1,nf),layout)
+
+    # Views with increments as leading dimension of batch
+    batchX = np.moveaxis(gridX,-1,0)
+    batchZ = np.moveaxis(gridZ,-1,0)
+    batchR = np.moveaxis(recX,-1,0)
+
+    chunks = ReconstructChunks(nny,nnx,nnz,nf,memory)
+    for c in tqdm(chunks,desc=desc,leave=False,disable=desc is None):
+        nb = c.stop - c.start
+
+        # Middle surface between front and back surfaces
+        if gridN is not None:
+            _subroutines.MidSurface(batchX[c],np.moveaxis(gridN[...,c],-1,0))
+
+        # Reconstruct deformed configuration through bezier curve
+        batchR[c] = _subroutines.Bezier(batchX[c],batchZ[c])
+
+        # Elements volume in deformed configuration
+        evol[...,c] = _subroutines.Volume(recX[...,c],nny,nnx,nnz,nb)
+
+    return recX,evol
@@ -1,8 +1,136 @@
 import numpy as np
-import matlab.engine
-from scipy.interpolate import griddata
+from scipy.spatial import Delaunay
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import connected_components
 
-def FindBoundary(expX,grid,mat):
+def InterpolationMatrix(tri,xi):
+    """
+    Generate sparse linear interpolation operator on Delaunay triangulation.
+
+    Parameters
+    ----------
+    tri : object
+        Delaunay triangulation of experimental points.
+    xi : (m,2),float
+        Coordinates of points to interpolate.
+
+    Returns
+    -------
+    W : (m,np),sparse
+        Barycentric interpolation weights of points to interpolate.
+
+    Notes
+    -----
+    np : int
+        Number of experimental points.
+
+    Theory
+    ------
+    Each point to interpolate is located in a triangle of the Delaunay
+      triangulation and its barycentric coordinates are the weights of
+      the three vertices, as in scipy griddata with linear method. Points
+      outside the convex hull have a single nan weight, so that the
+      interpolation of any field through W @ field gives nan as in
+      griddata with default fill value.
+    """
+
+    m = xi.shape[0]
+    npts = tri.points.shape[0]
+
+    # Triangles containing points to interpolate
+    simplex = tri.find_simplex(xi)
+    valid = simplex >= 0
+
+    # Barycentric coordinates of points inside triangulation
+    trans = tri.transform[simplex[valid]]
+    bary = np.einsum('ijk,ik->ij',trans[:,:2,:],xi[valid] - trans[:,2,:])
+    bary = np.column_stack((bary,1 - np.sum(bary,1)))
+
+    # Assign weights to vertices and nan to points outside triangulation
+    rows = np.concatenate((np.repeat(np.where(valid)[0],3),
+                           np.where(~valid)[0]))
+    cols = np.concatenate((tri.simplices[simplex[valid]].flatten(),
+                           np.zeros(np.sum(~valid),dtype=int)))
+    data = np.concatenate((bary.flatten(),np.full(np.sum(~valid),np.nan)))
+
+    W = csr_matrix((data,(rows,cols)),shape=(m,npts))
+
+    return W
+
+def AlphaShape(tri,shrink):
+    """
+    Select triangles of alpha shape with matlab boundary shrink factor.
+
+    Parameters
+    ----------
+    tri : object
+        Delaunay triangulation of experimental points.
+    shrink : float
+        Shrink factor between 0 (convex hull) and 1 (compact boundary).
+
+    Returns
+    -------
+    inside : (nt,),bool
+        Triangles inside alpha shape.
+
+    Notes
+    -----
+    nt : int
+        Number of triangles of Delaunay triangulation.
+
+    Theory
+    ------
+    A triangle belongs to the alpha shape if its circumradius is not
+      larger than alpha. The critical alpha is the smallest one for which
+      all points belong to the alpha shape, and alpha is chosen from the
+      spectrum of circumradii between the critical alpha (shrink = 1) and
+      the largest circumradius (shrink = 0), as in matlab boundary.
+      Holes enclosed by the alpha shape are filled, so that the region
+      matches the interior of its outer boundary.
+    """
+
+    # Circumradius of each triangle
+    pts = tri.points[tri.simplices]
+    e0 = np.linalg.norm(pts[:,1] - pts[:,2],axis=1)
+    e1 = np.linalg.norm(pts[:,2] - pts[:,0],axis=1)
+    e2 = np.linalg.norm(pts[:,0] - pts[:,1],axis=1)
+    area = abs(np.cross(pts[:,1] - pts[:,0],pts[:,2] - pts[:,0]))/2
+    with np.errstate(divide='ignore'):
+        rad = e0*e1*e2/(4*area)
+
+    # Critical alpha for which all points belong to alpha shape
+    radmin = np.full(tri.points.shape[0],np.inf)
+    for i in range(3):
+        np.minimum.at(radmin,tri.simplices[:,i],rad)
+    acrit = np.max(radmin[np.isfinite(radmin)])
+
+    # Select alpha from spectrum based on shrink factor
+    spec = np.unique(rad[np.isfinite(rad) & (rad >= acrit)])
+    idx = max(int(np.ceil((1 - shrink)*spec.size)),1) - 1
+    inside = rad <= spec[idx]
+
+    # Fill holes not connected to convex hull through outside triangles
+    outside = np.where(~inside)[0]
+    if outside.size > 0:
+        nbrs = tri.neighbors[outside]
+        valid = (nbrs >= 0)
+        valid[valid] = ~inside[nbrs[valid]]
+
+        label = np.full(inside.size,-1)
+        label[outside] = np.arange(outside.size)
+
+        rows = np.repeat(np.arange(outside.size),3)[valid.flatten()]
+        cols = label[nbrs[valid]]
+        graph = coo_matrix((np.ones(rows.size),(rows,cols)),
+                           shape=(outside.size,outside.size))
+        _,comp = connected_components(graph,directed=False)
+
+        hull = np.unique(comp[np.any(nbrs < 0,1)])
+        inside[outside[~np.isin(comp,hull)]] = True
+
+    return inside
+
+def FindBoundary(expX,grid,mat=None,shrink=0.8,tri=None):
     """
     Find regular grid points inside geometry.
 
@@ -12,8 +140,12 @@ def FindBoundary(expX,grid,mat):
         Reference xy coordinates of experimental points in one surface.
     grid : (nny,nnx,2),float
         Regular grid xy coordinates.
-    eng : object
-        Matlab engine.
+    mat : object
+        Matlab engine. If None, boundary is found with numpy and scipy.
+    shrink : float
+        Shrink factor of boundary between 0 and 1.
+    tri : object
+        Delaunay triangulation of experimental points, if available.
 
     Returns
     -------
@@ -26,21 +158,36 @@ def FindBoundary(expX,grid,mat):
         Number of experimental points.
     """
 
-    xc = mat.transpose(matlab.double(list(expX[:,0])))
-    yc = mat.transpose(matlab.double(list(expX[:,1])))
+    # Find boundary and points inside it through matlab engine
+    if mat is not None:
+        import matlab.engine
+
+        xc = mat.transpose(matlab.double(list(expX[:,0])))
+        yc = mat.transpose(matlab.double(list(expX[:,1])))
+
+        k = np.array(mat.boundary(xc,yc,shrink),int).flatten() - 1
 
-    k = np.array(mat.boundary(xc,yc,0.8),int).flatten() - 1
+        xcIn = matlab.double(list(np.array(xc).flatten()[k]))
+        ycIn = matlab.double(list(np.array(yc).flatten()[k]))
+        xxgrid = matlab.double(grid[...,0].tolist())
+        yygrid = matlab.double(grid[...,1].tolist())
 
-    xcIn = matlab.double(list(np.array(xc).flatten()[k]))
-    ycIn = matlab.double(list(np.array(yc).flatten()[k]))
-    xxgrid = matlab.double(grid[...,0].tolist())
-    yygrid = matlab.double(grid[...,1].tolist())
+        ptsin = np.array(mat.inpolygon(xxgrid,yygrid,xcIn,ycIn))
 
-    ptsin = np.array(mat.inpolygon(xxgrid,yygrid,xcIn,ycIn))
+        return ptsin
+
+    # Alpha shape of experimental points
+    if tri is None:
+        tri = Delaunay(expX)
+    inside = AlphaShape(tri,shrink)
+
+    # Regular grid points inside triangles of alpha shape
+    simplex = tri.find_simplex(grid[...,:2])
+    ptsin = np.logical_and(simplex >= 0,inside[simplex])
 
     return ptsin
 
-def RegularGrid(expX,expU,mat,nf):
+def RegularGrid(expX,expU,nf,mat=None):
     """
     Generate regular grid by interpolating experimental data.
 
@@ -50,10 +197,10 @@ def RegularGrid(expX,expU,mat,nf):
         Reference coordinates of experimental points.
     expU : (np,3,2,nf),float
         Displacements of experimental points.
-    mat : object
-        Matlab engine.
     nf : int
         Number of increments.
+    mat : object
+        Matlab engine. If None, boundary is found with numpy and scipy.
 
     Returns
     -------
@@ -90,23 +237,32 @@ def RegularGrid(expX,expU,mat,nf):
     xx,yy,zz = np.meshgrid(dx,dy,[0,0])
     grid = np.stack((xx,yy,zz),axis=3)
 
+    # Triangulation and interpolation operator of each surface
+    tri,W = [],[]
+    for i in range(2):
+        tri.append(Delaunay(expX[:,:2,i]))
+        W.append(InterpolationMatrix(tri[i],np.reshape(grid[...,i,:2],(-1,2))))
+
     # Assign experimental points z coordinates to regular grid
     for i in range(2):
-        grid[...,i,2] = griddata(expX[:,:2,i],expX[:,-1,i],grid[...,i,:2])
+        grid[...,i,2] = np.reshape(W[i] @ expX[:,-1,i],(nny,nnx))
 
     # Find regular grid points inside geometry
     ptsin = np.zeros((nny,nnx,2),dtype=bool)
     for i in range(2):
-        ptsin[...,i] = FindBoundary(expX[...,:2,i],grid[...,i,:],mat)
+        ptsin[...,i] = FindBoundary(expX[...,:2,i],grid[...,i,:],mat,
+                                    tri=tri[i])
 
     # Assign nan to points outside geometry
     ptsin = np.logical_or(ptsin[...,0],ptsin[...,1])
     grid[~ptsin,...] = np.nan
 
-    # Interpolate displacement field to regular grid
+    # Interpolate displacement field of all increments to regular grid
     gridU = np.zeros((nny,nnx,2,3,nf))
     for i in range(2):
-        gridU[...,i,:,:] = griddata(expX[:,:2,i],expU[...,i,:],grid[...,i,:2])
+        expUsurf = np.reshape(expU[...,i,:],(-1,3*nf))
+        gridU[...,i,:,:] = np.reshape(W[i] @ expUsurf,(nny,nnx,3,nf))
+    gridU[~ptsin,...] = np.nan
 
     # Obtain deformed grid coordinates
     gridX = grid[...,None] + gridU
@@ -1,6 +1,50 @@
 import numpy as np
+from functools import lru_cache
 
-def ReshapeMesh(fieldN,nny,nnx,nnz,nf=None):
+@lru_cache(maxsize=None)
+def ElementIndex(nny,nnx,nnz):
+    """
+    Precompute regular grid node indices of the elements corners.
+
+    Parameters
+    ----------
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+
+    Returns
+    -------
+    idxI : (ney,1,1,8),int
+        Node indices of elements corners in y-direction.
+    idxJ : (1,nex,1,8),int
+        Node indices of elements corners in x-direction.
+    idxK : (1,1,nez,8),int
+        Node indices of elements corners in z-direction.
+    """
+
+    # Number of elements
+    ney,nex,nez = nny-1,nnx-1,nnz-1
+
+    # Nodes of each element relative to its first node
+    x = np.array([1,1,1,1,0,0,0,0])
+    y = np.array([0,1,1,0,0,1,1,0])
+    z = np.array([0,0,1,1,0,0,1,1])
+
+    # Broadcastable indices of elements corners
+    idxI = np.arange(ney)[:,None,None,None] + x
+    idxJ = np.arange(nex)[None,:,None,None] + y
+    idxK = np.arange(nez)[None,None,:,None] + z
+
+    # Protect cached indices from modification
+    for idx in [idxI,idxJ,idxK]:
+        idx.flags.writeable = False
+
+    return idxI,idxJ,idxK
+
+def ReshapeMesh(fieldN,nny,nnx,nnz,nf=None,corners=False):
     """
     Reshape mesh field by elements.
 
@@ -16,11 +60,15 @@ def ReshapeMesh(fieldN,nny,nnx,nnz,nf=None):
         Number of nodes of regular grid in z-direction.
     nf : int
         Number of increments.
+    corners : bool
+        Return views of the elements corners instead of a copy by element.
 
     Returns
     -------
     fieldE : (ne,8,3) or (nf,ne,8,3),float
         Field of reconstructed nodes by element on regular grid.
+    fieldC : tuple of 8 (ney,nex,nez,3) or (nf,ney,nex,nez,3),float
+        Views of field on elements corners, if corners is True.
 
     Notes
     -----
@@ -31,20 +79,23 @@ def ReshapeMesh(fieldN,nny,nnx,nnz,nf=None):
     # Number of elements
     ney,nex,nez = nny-1,nnx-1,nnz-1
 
-    # Reshape mesh coordinates by element
-    x = np.array([1,1,1,1,0,0,0,0])
-    y = np.array([0,1,1,0,0,1,1,0])
-    z = np.array([0,0,1,1,0,0,1,1])
+    # Views of field on each element corner without copy
+    if corners:
+        x = np.array([1,1,1,1,0,0,0,0])
+        y = np.array([0,1,1,0,0,1,1,0])
+        z = np.array([0,0,1,1,0,0,1,1])
 
-    if nf is None:
-        fieldE = np.zeros((ney,nex,nez,8,3))
-    else:
-        fieldE = np.zeros((ney,nex,nez,8,3,nf))
+        fieldC = [fieldN[x[c]:x[c]+ney,y[c]:y[c]+nex,z[c]:z[c]+nez,...]
+                  for c in range(8)]
+
+        if nf is not None:
+            fieldC = [np.moveaxis(corner,-1,0) for corner in fieldC]
+
+        return tuple(fieldC)
 
-    for i in range(ney):
-        for j in range(nex):
-            for k in range(nez):
-                fieldE[i,j,k,...] = fieldN[i+x,j+y,k+z,...]
+    # Gather field by element through precomputed indices
+    idxI,idxJ,idxK = ElementIndex(nny,nnx,nnz)
+    fieldE = fieldN[idxI,idxJ,idxK,...]
 
     # Reshape to vector
     if nf is None:
@@ -52,4 +103,4 @@ def ReshapeMesh(fieldN,nny,nnx,nnz,nf=None):
     else:
         fieldE = np.moveaxis(np.reshape(fieldE,(ney*nex*nez,8,3,nf)),-1,0)
 
-    return fieldE
\ No newline at end of file
+    return fieldE
@@ -0,0 +1,174 @@
+import os
+import numpy as np
+from functools import partial
+from p_tqdm import p_map
+
+import _subroutines
+
+# Environment variables of thread pools of BLAS and OpenMP libraries
+THREADS = ['OMP_NUM_THREADS','OPENBLAS_NUM_THREADS','MKL_NUM_THREADS',
+           'BLIS_NUM_THREADS','VECLIB_MAXIMUM_THREADS','NUMEXPR_NUM_THREADS']
+
+def NumWorkers(workers=None,threads=1):
+    """
+    Number of worker processes of parallel processing.
+
+    Parameters
+    ----------
+    workers : int
+        Number of worker processes. If None, all cpus available to the
+        current process are used.
+    threads : int
+        Number of BLAS threads of each worker process.
+
+    Returns
+    -------
+    workers : int
+        Number of worker processes.
+    """
+
+    if workers is not None:
+        return max(1,int(workers))
+
+    # Cpus available to current process (affinity aware when supported)
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    return max(1,cpus // max(1,threads))
+
+def PinThreads(threads=1):
+    """
+    Limit BLAS and OpenMP threads of current process.
+
+    Parameters
+    ----------
+    threads : int
+        Number of threads of BLAS and OpenMP thread pools.
+
+    Notes
+    -----
+    Environment variables only apply to libraries loaded afterwards (e.g.
+      spawned workers), so thread pools already loaded are limited through
+      threadpoolctl when installed.
+    """
+
+    for var in THREADS:
+        os.environ[var] = str(threads)
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(threads)
+    except ImportError:
+        pass
+
+    return
+
+def ChunkTask(chunk,func,threads,chain,profile=None):
+
+    # Pin threads of worker before running chunk of tasks
+    PinThreads(threads)
+
+    # Profile chunk in worker with mode of parent process
+    if profile is not None:
+        _subroutines.EnableProfile(profile)
+
+    # Pass previous increment of chunk to chained tasks
+    if chain:
+        rec = [func(f,seed=None if i == 0 else chunk[i-1])
+               for i,f in enumerate(chunk)]
+    else:
+        rec = [func(f) for f in chunk]
+
+    # Send records of worker back with results
+    if profile is not None:
+        return rec,_subroutines.CollectProfile()
+
+    return rec
+
+def ScheduleMap(func,incs,workers=None,chunksize=1,threads=1,cost=None,
+                desc=None,chain=False):
+    """
+    Map function over increments in parallel by expected cost.
+
+    Parameters
+    ----------
+    func : callable
+        Function of increment f.
+    incs : (ni,),int
+        Increments to map.
+    workers : int
+        Number of worker processes. If None, detected from available cpus.
+    chunksize : int
+        Number of increments dispatched to a worker at once.
+    threads : int
+        Number of BLAS threads of each worker process.
+    cost : (ni,),float
+        Expected cost of each increment. If None, later increments (larger
+        deformations) are expected to be more expensive.
+    desc : str
+        Description of progress bar.
+    chain : bool
+        Call func(f,seed=g) with g the previous increment of the chunk (None
+        for the first one), e.g. to warm start f from g. Chunks are enlarged
+        to at least one per worker.
+
+    Returns
+    -------
+    rec : list
+        Results of func in order of incs.
+
+    Notes
+    -----
+    Chunks are contiguous runs of incs dispatched in decreasing total
+      expected cost, so that long chunks start first and do not straggle
+      at the end of the map.
+    """
+
+    incs = np.asarray(incs)
+    if cost is None:
+        cost = incs
+    cost = np.asarray(cost,dtype=float)
+
+    # Chains of increments of each worker
+    if chain:
+        chunksize = max(chunksize,-(-incs.size // NumWorkers(workers,threads)))
+
+    # Dispatch contiguous chunks of increments in decreasing expected cost
+    starts = np.arange(0,incs.size,chunksize)
+    order = np.argsort(-np.add.reduceat(cost,starts),kind='stable')
+    chunks = [incs[starts[i]:starts[i]+chunksize] for i in order]
+
+    # Limit BLAS threads of spawned workers through environment
+    env = {var: os.environ.get(var) for var in THREADS}
+    for var in THREADS:
+        os.environ[var] = str(threads)
+
+    try:
+        profile = _subroutines.Profiling()
+        task = partial(ChunkTask,func=func,threads=threads,chain=chain,
+                       profile=profile)
+        workers = min(NumWorkers(workers,threads),len(chunks))
+        rec = p_map(task,chunks,num_cpus=workers,desc=desc)
+
+    # Restore environment of current process
+    finally:
+        for var,value in env.items():
+            if value is None:
+                os.environ.pop(var,None)
+            else:
+                os.environ[var] = value
+
+    # Merge records of workers into profile of current stage
+    if profile is not None:
+        for r in rec:
+            _subroutines.MergeProfile(r[1])
+        rec = [r[0] for r in rec]
+
+    # Results in order of increments
+    out = [None]*len(chunks)
+    for i,r in zip(order,rec):
+        out[i] = r
+
+    return [r for chunk in out for r in chunk]
@@ -0,0 +1,166 @@
+import numpy as np
+from functools import partial, lru_cache
+from multiprocessing import shared_memory
+
+import _subroutines
+
+def ShareArrays(arrays,shms):
+    """
+    Copy arrays to shared memory blocks.
+
+    Parameters
+    ----------
+    arrays : dict
+        Arrays to share, possibly nested in dicts (e.g. eFEM).
+    shms : dict
+        Shared memory blocks by name, updated with blocks of shared arrays.
+
+    Returns
+    -------
+    specs : dict
+        Name, shape and dtype of shared memory block of each array and
+        order of its dimensions in memory, with the same nesting as arrays.
+    """
+
+    specs = {}
+    for key,array in arrays.items():
+        if isinstance(array,dict):
+            specs[key] = ShareArrays(array,shms)
+            continue
+
+        shm = shared_memory.SharedMemory(create=True,size=max(array.nbytes,1))
+        shms[shm.name] = shm
+
+        # Keep memory order of dimensions (e.g. increment-major layout)
+        axes = tuple(int(i) for i in np.argsort(np.negative(array.strides),
+                                                 kind='stable'))
+        base = np.transpose(array,axes)
+
+        np.ndarray(base.shape,dtype=array.dtype,buffer=shm.buf)[...] = base
+
+        specs[key] = (shm.name,base.shape,array.dtype.str,axes)
+
+    return specs
+
+@lru_cache(maxsize=None)
+def AttachArray(name,shape,dtype,axes):
+    """
+    Attach array to shared memory block in worker process.
+
+    Parameters
+    ----------
+    name : str
+        Name of shared memory block.
+    shape : tuple
+        Shape of shared block, with dimensions in memory order.
+    dtype : str
+        Data type of shared array.
+    axes : tuple
+        Dimensions of shared array in memory order.
+
+    Returns
+    -------
+    shm : SharedMemory
+        Shared memory block, kept attached until worker exits.
+    array : ndarray
+        Array on shared memory block.
+    """
+
+    # Leave unlinking of block to creating process (python >= 3.13)
+    try:
+        shm = shared_memory.SharedMemory(name=name,track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+
+    array = np.ndarray(shape,dtype=dtype,buffer=shm.buf)
+    array = np.transpose(array,np.argsort(axes))
+
+    return shm,array
+
+def AttachArrays(specs):
+
+    arrays = {}
+    for key,spec in specs.items():
+        if isinstance(spec,dict):
+            arrays[key] = AttachArrays(spec)
+        else:
+            arrays[key] = AttachArray(*spec)[1]
+
+    return arrays
+
+def CopyArrays(arrays,specs,shms):
+
+    for key,spec in specs.items():
+        if isinstance(spec,dict):
+            CopyArrays(arrays[key],spec,shms)
+        else:
+            name,shape,dtype,axes = spec
+            array = np.ndarray(shape,dtype=dtype,buffer=shms[name].buf)
+            arrays[key][...] = np.transpose(array,np.argsort(axes))
+
+    return
+
+def SharedTask(f,func,specs,kwargs,**task):
+
+    # Arrays on shared memory are modified in place by task
+    func(f,**AttachArrays(specs),**kwargs,**task)
+
+    return f
+
+def SharedMap(func,incs,arrays,workers=None,chunksize=1,desc=None,chain=False,
+              **kwargs):
+    """
+    Map function over increments in parallel with arrays in shared memory.
+
+    Parameters
+    ----------
+    func : callable
+        Function of increment f writing its results in place, called as
+        func(f,**arrays,**kwargs).
+    incs : (ni,),int
+        Increments to map.
+    arrays : dict
+        Arrays read and written by func, possibly nested in dicts.
+    workers : int
+        Number of worker processes. If None, detected from available cpus.
+    chunksize : int
+        Number of increments dispatched to a worker at once.
+    desc : str
+        Description of progress bar.
+    chain : bool
+        Call func with the previous increment of its chunk as seed.
+    **kwargs
+        Further arguments of func.
+
+    Returns
+    -------
+    status : list of int
+        Increments completed by workers.
+
+    Notes
+    -----
+    Arrays are copied once to shared memory, so that tasks only send the
+      increment and return its status instead of pickling all arrays to
+      and from each worker. The results are copied back to arrays once
+      all tasks are completed.
+    """
+
+    shms = {}
+    try:
+        specs = ShareArrays(arrays,shms)
+
+        # Map increments with small pickled task
+        task = partial(SharedTask,func=func,specs=specs,kwargs=kwargs)
+        status = _subroutines.ScheduleMap(task,incs,workers,chunksize,
+                                          desc=desc,chain=chain)
+
+        # Copy results from shared memory to arrays
+        CopyArrays(arrays,specs,shms)
+
+    finally:
+        AttachArray.cache_clear()
+        for shm in shms.values():
+            shm.close()
+            shm.unlink()
+
+    return status
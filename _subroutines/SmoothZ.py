@@ -0,0 +1,72 @@
+import numpy as np
+from functools import lru_cache
+from scipy.signal import savgol_filter
+
+@lru_cache(maxsize=None)
+def SavgolMatrix(n):
+    """
+    Savitzky-Golay projection matrix of a full-length window.
+
+    Parameters
+    ----------
+    n : int
+        Number of points of smoothed lines.
+
+    Returns
+    -------
+    P : (n,n),float
+        Read-only projection matrix such that P @ z = savgol_filter(z,n,2).
+    """
+
+    P = savgol_filter(np.eye(n),n,2,axis=0)
+    P.flags.writeable = False
+
+    return P
+
+def SmoothZ(maskZ,nny,nnx,nnz):
+    """
+    Smooth z distribution of regular grid in x and y directions.
+
+    Parameters
+    ----------
+    maskZ : (nny+2,nnx+2,nnz,2),float
+        Z-position of points along Bézier curves with nan boundaries.
+    nny : int
+        Number of nodes of regular grid in y-direction.
+    nnx : int
+        Number of nodes of regular grid in x-direction.
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+
+    Returns
+    -------
+    maskZ : (nny+2,nnx+2,nnz,2),float
+        Smoothed z-position of points along Bézier curves (in place).
+
+    Theory
+    ------
+    With a window equal to the line length, the quadratic Savitzky-Golay
+      filter is the projection of each line onto quadratic polynomials,
+      a fixed linear map P of the line length. Smoothing every row and
+      then every column of interior layers k is therefore
+
+        Z(:,:,k) = Py @ (Z(:,:,k) @ Px^T),
+
+      computed as one tensor contraction per direction.
+    """
+
+    Px = SavgolMatrix(nnx)
+    Py = SavgolMatrix(nny)
+
+    # Interior z layers of regular grid
+    Z = maskZ[1:-1,1:-1,1:nnz-1,0]
+
+    # Smooth z-bias in x-direction
+    Z = np.moveaxis(np.tensordot(Px,Z,(1,1)),0,1)
+
+    # Smooth z-bias in y-direction
+    Z = np.tensordot(Py,Z,(1,0))
+
+    maskZ[1:-1,1:-1,1:nnz-1,0] = Z
+
+    return maskZ
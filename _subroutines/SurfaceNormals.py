@@ -1,7 +1,6 @@
 import numpy as np
-import matlab.engine
 
-def SurfaceNormals(gridX,mat,nny,nnx,nf):
+def SurfaceNormals(gridX,nny,nnx,nf,mat=None):
     """
     Compute regular grid surface normals.
 
@@ -9,35 +8,82 @@ def SurfaceNormals(gridX,mat,nny,nnx,nf):
     ----------
     gridX : (nny,nnx,2,3,nf),float
         Regular grid surface coordinates.
-    mat : object
-        Matlab engine.
     nny : int
         Number of nodes of regular grid in y-direction.
     nnx : int
         Number of nodes of regular grid in x-direction.
     nf : int
         Number of increments.
+    mat : object
+        Matlab engine. If None, surface normals are computed with numpy.
 
     Returns
     -------
     gridN : (nny,nnx,2,3,nf),float
         Regular grid surface normals.
+
+    Theory
+    ------
+    Surface normals follow the bicubic fit of matlab surfnorm. Both
+      surfaces are expanded by one node on each side through quadratic
+      extrapolation
+
+        X(0) = 3*X(1) - 3*X(2) + X(3),
+
+      so that central differences in x and y directions
+
+        a(i,j) = (X(i,j-1) - X(i,j+1))/2,
+        b(i,j) = (X(i+1,j) - X(i-1,j))/2,
+
+      are valid at the boundaries, and the normal is given by the
+      normalised cross product n = -(a x b).
     """
 
-    gridN = np.zeros((nny,nnx,2,3,nf))
-    for f in range(nf):
-        norm = np.moveaxis(np.zeros((nny,nnx,2,3)),[3,0,1,2],[0,1,2,3])
+    # Compute surface normals through matlab engine
+    if mat is not None:
+        import matlab.engine
+
+        gridN = np.zeros((nny,nnx,2,3,nf))
+        for f in range(nf):
+            norm = np.moveaxis(np.zeros((nny,nnx,2,3)),[3,0,1,2],[0,1,2,3])
+
+            # Compute surface normals of front and back surfaces
+            for i in range(2):
+                xx = matlab.double(gridX[...,i,0,f].tolist())
+                yy = matlab.double(gridX[...,i,1,f].tolist())
+                zz = matlab.double(gridX[...,i,2,f].tolist())
+                norm[...,i] = np.array(mat.surfnorm(xx,yy,zz,nargout=3))
+
+            # Make z normals of back surface point towards center of specimen
+            norm[...,-1] = -norm[...,-1]
+
+            gridN[...,f] = np.moveaxis(norm,[0,1,2,3],[3,0,1,2])
+
+        return gridN
+
+    # Expand surfaces in y-direction by quadratic extrapolation
+    ext0 = 3*gridX[:1,...] - 3*gridX[1:2,...] + gridX[2:3,...]
+    ext1 = 3*gridX[-1:,...] - 3*gridX[-2:-1,...] + gridX[-3:-2,...]
+    expX = np.concatenate((ext0,gridX,ext1),0)
+
+    # Expand surfaces in x-direction by quadratic extrapolation
+    ext0 = 3*expX[:,:1,...] - 3*expX[:,1:2,...] + expX[:,2:3,...]
+    ext1 = 3*expX[:,-1:,...] - 3*expX[:,-2:-1,...] + expX[:,-3:-2,...]
+    expX = np.concatenate((ext0,expX,ext1),1)
+
+    # Central differences of all surfaces and increments
+    a = (expX[1:-1,:-2,...] - expX[1:-1,2:,...])/2
+    b = (expX[2:,1:-1,...] - expX[:-2,1:-1,...])/2
 
-        # Compute surface normals of front and back surfaces
-        for i in range(2):
-            xx = matlab.double(gridX[...,i,0,f].tolist())
-            yy = matlab.double(gridX[...,i,1,f].tolist())
-            zz = matlab.double(gridX[...,i,2,f].tolist())
-            norm[...,i] = np.array(mat.surfnorm(xx,yy,zz,nargout=3))
+    # Surface normals by cross product of central differences
+    gridN = -np.cross(a,b,axis=3)
 
-        # Make z normals of back surface point towards center of the specimen
-        norm[...,-1] = -norm[...,-1]
+    # Normalise surface normals
+    mag = np.sqrt(np.sum(gridN**2,3))
+    mag[mag == 0] = np.finfo(float).eps
+    gridN = gridN / mag[...,None,:]
 
-        gridN[...,f] = np.moveaxis(norm,[0,1,2,3],[3,0,1,2])
+    # Make z normals of back surface point towards center of specimen
+    gridN[...,-1,:,:] = -gridN[...,-1,:,:]
 
-    return gridN
\ No newline at end of file
+    return gridN
@@ -0,0 +1,105 @@
+import os
+import shutil
+import numpy as np
+
+def SyntheticSpecimen(name,length,width,thickness,pitch,nf,strain,
+                      mode='plane-strain',nnz=21,noise=0.0,seed=None):
+    """
+    Generate experimental files of plate under uniform isochoric stretch.
+
+    Parameters
+    ----------
+    name : str
+        Name of synthetic project, written to input/{name}.
+    length : float
+        Length of plate in x-direction.
+    width : float
+        Width of plate in y-direction.
+    thickness : float
+        Thickness of plate in z-direction.
+    pitch : float
+        Spacing of experimental points on both surfaces.
+    nf : int
+        Number of increments.
+    strain : float
+        Nominal strain in x-direction of last increment.
+    mode : str
+        Stretch of plate, 'plane-strain' (no stretch in y-direction) or
+        'uniaxial' (equal stretch in y and z directions).
+    nnz : int
+        Number of nodes of regular grid in z-direction.
+    noise : float
+        Standard deviation of gaussian noise added to displacements.
+    seed : int
+        Seed of random noise.
+
+    Returns
+    -------
+    stretch : (3,nf),float
+        Principal stretches of plate in x,y,z directions of each increment.
+
+    Notes
+    -----
+    Files follow the layout read by LoadExperimental, with both surfaces at
+      z = 0 and zlims of the input file at -/+ thickness/2, and back surface
+      z displacements flipped. The trimming limits of the input file keep
+      one pitch away from the edges of the plate.
+
+    Theory
+    ------
+    The stretch in x-direction grows linearly up to 1 + strain, and the
+      others follow from incompressibility lx*ly*lz = 1, so that the volume
+      of any part of the plate is constant through all increments.
+    """
+
+    # Principal stretches of each increment
+    lx = 1 + strain*np.linspace(0,1,nf)
+    if mode == 'plane-strain':
+        ly,lz = np.ones(nf),1/lx
+    elif mode == 'uniaxial':
+        ly = lz = 1/np.sqrt(lx)
+    stretch = np.array([lx,ly,lz])
+
+    # Experimental points of surfaces on regular pattern
+    nx = int(round(length/pitch)) + 1
+    ny = int(round(width/pitch)) + 1
+    xx,yy = np.meshgrid(np.linspace(-length/2,length/2,nx),
+                        np.linspace(-width/2,width/2,ny))
+    X = np.column_stack((xx.flatten(),yy.flatten(),np.zeros(nx*ny)))
+
+    rng = np.random.default_rng(seed)
+
+    # Write coordinates and displacements of each surface
+    dir = os.path.join('input',name)
+    head = 'x;y;z'
+    for surf,z,sign in [('front',thickness/2,1),('back',-thickness/2,-1)]:
+        sdir = os.path.join(dir,surf)
+        if os.path.isdir(sdir):
+            shutil.rmtree(sdir)
+        os.makedirs(sdir)
+
+        fpref = os.path.join(sdir,f'{name}_{surf}')
+        np.savetxt(f'{fpref}_X.csv',X,header=head,fmt='%.15f',delimiter=';',
+                   comments='')
+
+        for f in range(nf):
+            U = (stretch[:,f] - 1)*(X + [0,0,z])
+            U = U + noise*rng.standard_normal(U.shape)
+
+            # Flip back surface z displacements
+            U[:,2] = sign*U[:,2]
+
+            np.savetxt(f'{fpref}_U_{f}.csv',U,header=head,fmt='%.15f',
+                       delimiter=';',comments='')
+
+    # Write regular grid and trimming limits
+    xlim = length/2 - pitch
+    ylim = width/2 - pitch
+    zlim = thickness/2
+    with open(os.path.join(dir,f'{name}.inp'),'w') as f:
+        f.write(f'nnz,{nnz},0\n')
+        f.write(f'xlims,{-xlim},{xlim}\n')
+        f.write(f'ylims,{-ylim},{ylim}\n')
+        f.write(f'zlims,{-zlim},{zlim}')
+
+    return stretch
@@ -2,13 +2,13 @@ import numpy as np
 
 import _subroutines
 
-def Volume(coord,nny,nnx,nnz):
+def Volume(coord,nny,nnx,nnz,nf=None,fast=False):
     """
     Compute mesh elements volume by shape functions.
 
     Parameters
     ----------
-    coord : (nny,nnx,nnz,3),float
+    coord : (nny,nnx,nnz,3) or (nny,nnx,nnz,3,nf),float
         Coordinates of reconstructed nodes by element on regular grid.
     nny : int
         Number of nodes of regular grid in y-direction.
@@ -16,10 +16,14 @@ def Volume(coord,nny,nnx,nnz):
         Number of nodes of regular grid in x-direction.
     nnz : int
         Number of nodes of regular grid in z-direction.
+    nf : int
+        Number of increments.
+    fast : bool
+        Compute volume by closed-form determinant of jacobian matrix.
 
     Returns
     -------
-    evol : (ney,nex,nez),float
+    evol : (ney,nex,nez) or (ney,nex,nez,nf),float
         Volume of reconstructed elements on regular grid.
 
     Notes
@@ -35,13 +39,19 @@ def Volume(coord,nny,nnx,nnz):
     # Number of elements
     ney,nex,nez = nny-1,nnx-1,nnz-1
 
-    # Reshape coordinates by element
-    coord = _subroutines.ReshapeMesh(coord,nny,nnx,nnz)
+    # Views of coordinates on elements corners
+    coord = _subroutines.ReshapeMesh(coord,nny,nnx,nnz,nf,corners=True)
 
     # Compute elements volume by shape functions
-    _,_,evol = _subroutines.ElHex8R(coord)
+    if fast:
+        evol = _subroutines.ElHex8R(coord,volume=True)
+    else:
+        _,_,evol = _subroutines.ElHex8R(coord)
 
     # Reshape to matrix
-    evol = np.reshape(evol,(ney,nex,nez))
+    if nf is None:
+        evol = np.reshape(evol,(ney,nex,nez))
+    else:
+        evol = np.moveaxis(np.reshape(evol,(nf,ney,nex,nez)),0,-1)
 
-    return evol
\ No newline at end of file
+    return evol
@@ -9,21 +9,33 @@ from .MidSurface import *
 from .ExperimentalFEM import *
 from .Bezier import *
 from .Volume import *
+from .BezierVolume import *
 from .ReshapeMesh import *
 from .ElHex8R import *
+from .Layout import *
+from .Reconstruct import *
 from .GlobalVolume import *
 from .LocalVolume import *
+from .Scheduler import *
+from .SharedMap import *
+from .Profiler import *
 from .BiasZ import *
 from .OptimiseZ import *
+from .BatchCost import *
+from .PatchInvariants import *
+from .CostGradient import *
+from .SmoothZ import *
 from .LogStrain import *
 from .DefGrad import *
 from .PolarDecomposition import *
 from .TensorToVoigt import *
+from .EigenStrain import *
 from .GenerateFEM import *
 from .Export import *
 from .ExportCSV import *
 from .ExportMatlab import *
 from .ExportPickle import *
 from .ExportParaview import *
+from .SyntheticSpecimen import *
 
 
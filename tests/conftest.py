@@ -0,0 +1,50 @@
+import os
+import sys
+
+# Import _subroutines from root of repository
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import _subroutines
+
+def Plate(nny=6,nnx=7,nnz=7,outside=True):
+
+    # Flat plate of unit elements with nodes outside geometry in a corner
+    y,x = np.meshgrid(np.arange(nny,dtype=float),np.arange(nnx,dtype=float),
+                      indexing='ij')
+    gridX = np.zeros((nny,nnx,3,3))
+    for s,side in enumerate([1.0,0.0,-1.0]):
+        gridX[:,:,s,0] = x
+        gridX[:,:,s,1] = y
+        gridX[:,:,s,2] = side
+    if outside:
+        gridX[0,:2,...] = np.nan
+
+    gridZ = np.ones((nny,nnx,nnz)) * np.linspace(0,1,nnz)
+
+    return gridX,gridZ
+
+def BiasedZ(w,gridZ):
+
+    # Same z-bias of weight w at all nodes
+    nnz = gridZ.shape[-1]
+    optiZ = np.reshape(gridZ,(-1,nnz))
+    optiZ = _subroutines.BatchBiasZ(np.full(optiZ.shape[0],w),optiZ,nnz)
+
+    return np.reshape(optiZ,gridZ.shape)
+
+def Deformed(nny,nnx,nnz,nf,seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # Nodes of plate with affine and random displacements of increments
+    gridX,gridZ = Plate(nny,nnx,nnz,outside=False)
+    coord = _subroutines.Bezier(gridX,gridZ)
+    displ = np.zeros(coord.shape + (nf,))
+    for f in range(nf):
+        A = 0.1*(f+1)*rng.standard_normal((3,3))
+        displ[...,f] = (coord @ A.T
+                        + 0.02*(f+1)*rng.standard_normal(coord.shape))
+
+    return coord,displ
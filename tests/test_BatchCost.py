@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from importlib import import_module
+
+import _subroutines
+from conftest import Plate
+
+OptimiseZ = import_module('_subroutines.OptimiseZ')
+
+def Masks(nny,nnx,nnz,seed=0):
+
+    rng = np.random.default_rng(seed)
+    gridX,gridZ = Plate(nny,nnx,nnz)
+    recVr = rng.uniform(0.5,1.5,(nny-1,nnx-1,nnz-1))
+
+    # Masks with nan boundaries in xy directions
+    maskX = np.full((nny+2,nnx+2,3,3),np.nan)
+    maskZ = np.full((nny+2,nnx+2,nnz),np.nan)
+    maskVr = np.full((nny+1,nnx+1,nnz-1),np.nan)
+    maskX[1:-1,1:-1,...] = gridX
+    maskZ[1:-1,1:-1,...] = gridZ
+    maskVr[1:-1,1:-1,...] = recVr
+
+    return maskX,maskZ,maskVr
+
+@pytest.mark.parametrize('nny,nnx',[(1,1),(4,5),(7,9),(10,3)])
+def test_colors_are_independent(nny,nnx):
+
+    colors = _subroutines.NodeColors(nny,nnx)
+    assert len(colors) <= 9
+
+    # Every node in exactly one color
+    nodes = np.concatenate([np.stack(c,1) for c in colors])
+    assert len(nodes) == nny*nnx
+    assert len({tuple(n) for n in nodes}) == nny*nnx
+    assert np.all((nodes >= 1) & (nodes <= [nny,nnx]))
+
+    # Nodes of a color share no element and no patch
+    for I,J in colors:
+        dist = np.maximum(abs(I[:,None] - I[None,:]),
+                          abs(J[:,None] - J[None,:]))
+        np.fill_diagonal(dist,3)
+        assert np.all(dist >= 3)
+
+@pytest.mark.parametrize('invariants',[False,True])
+def test_batch_cost_matches_node_cost(invariants):
+
+    nny,nnx,nnz = 6,7,7
+    maskX,maskZ,maskVr = Masks(nny,nnx,nnz)
+    rng = np.random.default_rng(1)
+
+    for I,J in _subroutines.NodeColors(nny,nnx):
+        Xc,Zc,Vc = _subroutines.NodePatches(I,J,maskX,maskZ,maskVr)
+
+        # Random symmetric z distribution of each node
+        w = np.sort(rng.uniform(0.0,0.5,(I.size,int(nnz/2)-1)),1)
+        Z = OptimiseZ.GenerateZ(w,Zc[:,1,1,:],nnz)
+
+        inv = _subroutines.PatchInvariants(Xc,Zc) if invariants else None
+        cost = _subroutines.BatchCost(Z,Xc,Zc,Vc,nnz,inv)
+
+        # Cost of each node by per-node cost function of fast path
+        for n,(i,j) in enumerate(zip(I,J)):
+            ncost = OptimiseZ.Optimisation(w[n],maskX[i-1:i+2,j-1:j+2,...],
+                                           maskZ[i-1:i+2,j-1:j+2,:],
+                                           maskVr[i-1:i+1,j-1:j+1,:],nnz)
+            np.testing.assert_allclose(cost[n],ncost,rtol=1e-12)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import _subroutines
+from conftest import Plate
+
+def Batch(batch,nny,nnx,nnz,seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # Perturbed plates and z-positions with nodes outside geometry
+    gridX,gridZ = Plate(nny,nnx,nnz)
+    gridX = gridX + 0.05*rng.standard_normal(batch + gridX.shape)
+    gridZ = _subroutines.BatchBiasZ(
+                rng.uniform(-1,1,int(np.prod(batch + (nny,nnx)))),
+                np.reshape(np.broadcast_to(gridZ,batch + gridZ.shape),
+                           (-1,nnz)),nnz)
+
+    return gridX,np.reshape(gridZ,batch + (nny,nnx,nnz))
+
+def Reference(gridX,gridZ,nny,nnx,nnz):
+
+    # Volume of reconstructed points of each member of batch in turn
+    batch = gridZ.shape[:-3]
+    evol = np.empty(batch + (nny-1,nnx-1,nnz-1))
+    for b in np.ndindex(batch):
+        recX = _subroutines.Bezier(gridX[b],gridZ[b])
+        evol[b] = _subroutines.Volume(recX,nny,nnx,nnz,fast=True)
+
+    return evol
+
+@pytest.mark.parametrize('batch,nny,nnx,nnz',[((),3,3,5),
+                                              ((4,),3,3,5),
+                                              ((2,3),6,7,5),
+                                              ((3,),50,50,13)])
+def test_buffered_volume_matches_bezier_volume(batch,nny,nnx,nnz):
+
+    gridX,gridZ = Batch(batch,nny,nnx,nnz)
+    evol = Reference(gridX,gridZ,nny,nnx,nnz)
+
+    # Bitwise equal, also through reused buffers of a second call
+    buffered = _subroutines.BezierVolume(gridX,gridZ,nny,nnx,nnz,fused=False)
+    np.testing.assert_array_equal(buffered,evol)
+
+    other,otherZ = Batch(batch,nny,nnx,nnz,seed=1)
+    again = _subroutines.BezierVolume(other,otherZ,nny,nnx,nnz,fused=False)
+    np.testing.assert_array_equal(again,Reference(other,otherZ,nny,nnx,nnz))
+    np.testing.assert_array_equal(buffered,evol)
+
+def test_buffered_volume_into_out():
+
+    nny,nnx,nnz = 6,7,5
+    gridX,gridZ = Batch((2,3),nny,nnx,nnz)
+    evol = Reference(gridX,gridZ,nny,nnx,nnz)
+
+    # Contiguous and strided preallocated volume
+    out = np.empty((2,3,nny-1,nnx-1,nnz-1))
+    strided = np.empty((nny-1,nnx-1,nnz-1,2,3))
+    strided = np.moveaxis(strided,(-2,-1),(0,1))
+    for o in [out,strided]:
+        vol = _subroutines.BezierVolume(gridX,gridZ,nny,nnx,nnz,out=o,
+                                        fused=False)
+        assert vol is o
+        np.testing.assert_array_equal(o,evol)
+
+@pytest.mark.parametrize('batch,nny,nnx,nnz',[((),3,3,5),
+                                              ((2,3),6,7,5)])
+def test_fused_volume_matches_bezier_volume(batch,nny,nnx,nnz):
+
+    pytest.importorskip('numba')
+
+    gridX,gridZ = Batch(batch,nny,nnx,nnz)
+    evol = Reference(gridX,gridZ,nny,nnx,nnz)
+
+    fused = _subroutines.BezierVolume(gridX,gridZ,nny,nnx,nnz,fused=True)
+    np.testing.assert_allclose(fused,evol,rtol=1e-12,atol=1e-14)
+
+    # Strided preallocated volume
+    out = np.moveaxis(np.empty((nny-1,nnx-1,nnz-1) + batch),
+                      range(3),range(-3,0))
+    vol = _subroutines.BezierVolume(gridX,gridZ,nny,nnx,nnz,out=out,
+                                    fused=True)
+    assert vol is out
+    np.testing.assert_allclose(out,evol,rtol=1e-12,atol=1e-14)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+import _subroutines
+from conftest import Plate, BiasedZ
+
+@pytest.mark.parametrize('w0,w1',[(1.0,1.5),(0.8,0.5),(-1.0,-1.3)])
+def test_colored_matches_fast(w0,w1):
+
+    nny,nnx,nnz = 6,7,7
+    gridX,gridZ = Plate(nny,nnx,nnz)
+
+    # Reference volume of z-bias w1 reconstructed from z-bias w0
+    initZ = BiasedZ(w0,gridZ)
+    recV = _subroutines.Volume(_subroutines.Bezier(gridX,initZ),nny,nnx,nnz)
+    recVr = _subroutines.Volume(_subroutines.Bezier(gridX,BiasedZ(w1,gridZ)),
+                                nny,nnx,nnz)
+
+    result = {}
+    for speed in ['fast','colored']:
+        optiZ = _subroutines.BiasZ(gridX,np.copy(initZ),recV,recVr,
+                                   nny,nnx,nnz,speed,warm=True)
+        optiV = _subroutines.Volume(_subroutines.Bezier(gridX,optiZ),
+                                    nny,nnx,nnz)
+        result[speed] = optiZ,optiV
+
+    np.testing.assert_allclose(result['colored'][0],result['fast'][0],
+                               atol=1e-4)
+    np.testing.assert_allclose(result['colored'][1],result['fast'][1],
+                               rtol=1e-4,equal_nan=True)
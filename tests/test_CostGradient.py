@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from importlib import import_module
+
+import _subroutines
+from conftest import Plate
+
+OptimiseZ = import_module('_subroutines.OptimiseZ')
+BiasZ = import_module('_subroutines.BiasZ')
+
+def Patch(nnz,seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # Distorted 3x3 patch of plate with random reference volume
+    gridX,gridZ = Plate(3,3,nnz,outside=False)
+    Xij = gridX + 0.1*rng.standard_normal(gridX.shape)
+    Zij = np.copy(gridZ)
+    Vij = rng.uniform(0.5,1.5,(2,2,nnz-1))
+
+    return Xij,Zij,Vij
+
+def CentralDifference(func,w,eps=1e-6):
+
+    grad = np.zeros(w.size)
+    for k in range(w.size):
+        dw = np.zeros(w.size)
+        dw[k] = eps
+        grad[k] = (func(w + dw) - func(w - dw))/(2*eps)
+
+    return grad
+
+@pytest.mark.parametrize('invariants',[False,True])
+def test_optimise_gradient(invariants):
+
+    nnz = 9
+    Xij,Zij,Vij = Patch(nnz)
+    inv = _subroutines.PatchInvariants(Xij,Zij) if invariants else None
+    w = np.array([0.08,0.2,0.31])
+
+    cost,grad = OptimiseZ.OptimisationGradient(w,Xij,Zij,Vij,nnz,inv)
+    fd = CentralDifference(lambda v: OptimiseZ.Optimisation(v,Xij,Zij,Vij,
+                                                            nnz),w)
+
+    np.testing.assert_allclose(cost,OptimiseZ.Optimisation(w,Xij,Zij,Vij,nnz))
+    np.testing.assert_allclose(grad,fd,rtol=1e-5,atol=1e-8)
+
+@pytest.mark.parametrize('invariants',[False,True])
+@pytest.mark.parametrize('w',[0.7,-0.9,4.0])
+def test_bias_gradient(w,invariants):
+
+    nnz = 9
+    Xij,Zij,Vij = Patch(nnz,seed=1)
+    inv = _subroutines.PatchInvariants(Xij,Zij) if invariants else None
+    w = np.array([w])
+
+    cost,grad = BiasZ.OptimisationGradient(w,Xij,Zij,Vij,nnz,inv)
+    fd = CentralDifference(lambda v: BiasZ.Optimisation(v,Xij,Zij,Vij,nnz),w)
+
+    np.testing.assert_allclose(cost,BiasZ.Optimisation(w,Xij,Zij,Vij,nnz))
+    np.testing.assert_allclose(grad,fd,rtol=1e-5,atol=1e-8)
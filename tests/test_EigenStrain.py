@@ -0,0 +1,36 @@
+import numpy as np
+from scipy.linalg import logm, sqrtm
+
+import _subroutines
+from conftest import Deformed
+
+def test_eigen_strain_matches_matrix_logarithm():
+
+    nf,ne = 3,20
+    rng = np.random.default_rng(0)
+
+    # Rotated and stretched deformation gradients
+    Q,_ = np.linalg.qr(rng.standard_normal((nf,ne,3,3)))
+    Q = Q * np.sign(np.linalg.det(Q))[...,None,None]
+    dfgrd = (np.eye(3) + 0.3*rng.standard_normal((nf,ne,3,3))) @ Q
+
+    strain = _subroutines.EigenStrain(dfgrd,nf)
+
+    # Logarithm of left stretch tensor in voigt notation
+    for f in range(nf):
+        for e in range(ne):
+            F = dfgrd[f,e]
+            LE = np.real(logm(np.real(sqrtm(F @ F.T))))
+            voigt = [LE[0,0],LE[1,1],LE[2,2],
+                     2*LE[0,1],2*LE[0,2],2*LE[1,2]]
+            np.testing.assert_allclose(strain[e,:,f],voigt,atol=1e-10)
+
+def test_eigen_strain_matches_polar_decomposition():
+
+    nny,nnx,nnz,nf = 4,5,3,3
+    coord,displ = Deformed(nny,nnx,nnz,nf)
+
+    fast = _subroutines.LogStrain(coord,displ,nny,nnx,nnz,nf,fast=True)
+    polar = _subroutines.LogStrain(coord,displ,nny,nnx,nnz,nf,fast=False)
+
+    np.testing.assert_allclose(fast,polar,atol=1e-10)
@@ -0,0 +1,45 @@
+import numpy as np
+
+import _subroutines
+
+# Corners of unit hexahedron in order of natural coordinates
+CORNERS = np.array([[-1,-1, 1],[ 1,-1, 1],[ 1,-1,-1],[-1,-1,-1],
+                    [-1, 1, 1],[ 1, 1, 1],[ 1, 1,-1],[-1, 1,-1]])/2
+
+def Distorted(shape,seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # Randomly scaled, rotated and perturbed hexahedra
+    scale = rng.uniform(0.5,2.0,shape + (1,3))
+    Q,_ = np.linalg.qr(rng.standard_normal(shape + (3,3)))
+    coord = (CORNERS*scale) @ Q + rng.uniform(-5,5,shape + (1,3))
+
+    return coord + 0.1*rng.standard_normal(shape + (8,3))
+
+def test_volume_equals_determinant():
+
+    coord = Distorted((50,))
+    _,_,evol = _subroutines.ElHex8R(coord)
+
+    np.testing.assert_allclose(_subroutines.ElHex8R(coord,volume=True),
+                               evol,rtol=1e-12,atol=1e-12)
+
+def test_volume_equals_determinant_of_batched_corners():
+
+    coord = Distorted((4,30))
+    _,_,evol = _subroutines.ElHex8R(coord)
+
+    # Elements corners as tuple of views
+    corners = tuple(coord[...,c,:] for c in range(8))
+    np.testing.assert_allclose(_subroutines.ElHex8R(corners,volume=True),
+                               evol,rtol=1e-12,atol=1e-12)
+    np.testing.assert_allclose(_subroutines.ElHex8R(corners)[2],
+                               evol,rtol=1e-12,atol=1e-12)
+
+def test_volume_of_unit_hexahedron():
+
+    coord = CORNERS[None,...]
+
+    np.testing.assert_allclose(_subroutines.ElHex8R(coord,volume=True),1.0)
+    np.testing.assert_allclose(_subroutines.ElHex8R(coord)[2],1.0)
@@ -0,0 +1,20 @@
+import numpy as np
+
+import _subroutines
+
+def test_bracket_root_skips_nan_residuals():
+
+    roots = np.array([1.3,0.6,1.1])
+
+    def func(w,idx):
+        g = np.log(w) - np.log(roots[idx])
+        # Residual undefined above root of first and everywhere for last
+        g[(idx == 0) & (w > 1.5)] = np.nan
+        g[idx == 2] = np.nan
+        return g
+
+    a,b,ga,gb,found = _subroutines.BracketRoot(func,3)
+
+    np.testing.assert_array_equal(found,[False,True,False])
+    assert np.sign(ga[1]) != np.sign(gb[1])
+    assert min(a[1],b[1]) <= roots[1] <= max(a[1],b[1])
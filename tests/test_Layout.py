@@ -0,0 +1,80 @@
+import os
+import pickle
+
+import numpy as np
+import scipy.io
+
+import _subroutines
+from conftest import Plate
+
+def Fields(nny,nnx,nnz,nf,seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # Reconstructed plate with nodes outside geometry and random increments
+    gridX,gridZ = Plate(nny,nnx,nnz)
+    gridX = np.repeat(gridX[...,None],nf,-1)
+    gridX += 0.05*rng.standard_normal(gridX.shape)
+    gridZ = np.repeat(gridZ[...,None],nf,-1)
+    recX,evol = _subroutines.Reconstruct(gridX,gridZ,nny,nnx,nnz,nf)
+
+    # Fields of elements outside geometry are nan as well
+    ne = (nny-1,nnx-1,nnz-1)
+    outside = np.isnan(evol[...,0])
+    eFEM = {'X': recX,'EVOL': evol,
+            'U': recX - recX[...,0,None],
+            'LE': rng.standard_normal(ne + (6,nf)),
+            'VOL': np.ones(ne + (nf,))*np.nansum(evol,(0,1,2))}
+    eFEM['LE'][outside] = np.nan
+    for key in ['X','U','LE','EVOL','VOL']:
+        eFEM[f'r{key}'] = rng.standard_normal(eFEM[key].shape)
+        eFEM[f'r{key}'][np.isnan(eFEM[key])] = np.nan
+
+    return eFEM
+
+def Exported(eFEM,nf,dir):
+
+    # Mesh in vector form written to mat, pickle and csv files
+    eFEM = _subroutines.GenerateFEM(eFEM,*eFEM['X'].shape[:3],nf)
+    _subroutines.ExportMatlab(eFEM,dir)
+    _subroutines.ExportPickle(eFEM,dir)
+    _subroutines.ExportCSV(eFEM,nf,dir)
+
+    outF = os.path.join('output',dir,dir)
+    with open(f'{outF}.pkl','rb') as f:
+        mesh = pickle.load(f)['Mesh']
+    matlab = scipy.io.loadmat(f'{outF}.mat')['Mesh'][0,0]
+    csv = {}
+    for path in sorted(os.listdir(os.path.join('output',dir))):
+        if path.endswith('.csv'):
+            with open(os.path.join('output',dir,path)) as f:
+                csv[path] = f.read()
+
+    return mesh,matlab,csv
+
+def test_increment_layout_exports_same_arrays(tmp_path,monkeypatch):
+
+    nny,nnx,nnz,nf = 5,6,4,3
+    trailing = Fields(nny,nnx,nnz,nf)
+    increment = {key: _subroutines.ToLayout(value,'increment')
+                 for key,value in trailing.items()}
+    assert _subroutines.Layout(increment['X']) == 'increment'
+    assert _subroutines.Layout(trailing['X']) == 'trailing'
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join('output','trailing'))
+    os.makedirs(os.path.join('output','increment'))
+    meshT,matT,csvT = Exported(trailing,nf,'trailing')
+    meshI,matI,csvI = Exported(increment,nf,'increment')
+
+    # Same mesh arrays whatever the storage layout of increments
+    assert meshI.keys() == meshT.keys()
+    for key in meshT:
+        assert meshI[key].shape == meshT[key].shape
+        np.testing.assert_array_equal(meshI[key],meshT[key])
+        np.testing.assert_array_equal(matI[key],matT[key])
+    assert np.isfinite(meshT['LE']).all()
+
+    # Same csv files up to name of project
+    assert [p.replace('increment','trailing') for p in csvI] == list(csvT)
+    assert list(csvI.values()) == list(csvT.values())
@@ -0,0 +1,55 @@
+import os
+import json
+from importlib import import_module
+
+import numpy as np
+import pytest
+
+import _subroutines
+
+LoadExperimental = import_module('_subroutines.LoadExperimental')
+
+def Specimen(name):
+
+    # Small synthetic plate with noisy displacements
+    _subroutines.SyntheticSpecimen(name,4.0,2.0,1.0,0.5,3,0.1,nnz=5,
+                                   noise=1e-3,seed=0)
+
+    return os.path.join('input',name)
+
+def test_interrupted_rebuild_is_not_loaded(tmp_path,monkeypatch):
+
+    monkeypatch.chdir(tmp_path)
+    name = 'Cache'
+    dir = Specimen(name)
+    zlims = np.zeros(2)
+
+    expX,expU,nf = LoadExperimental.LoadExperimental(name,zlims,cache=False)
+    LoadExperimental.LoadExperimental(name,zlims)
+    manifest = os.path.join(dir,'cache','manifest.json')
+    assert os.path.isfile(manifest)
+
+    # Modified files and rebuild interrupted before its manifest is written
+    path = os.path.join(dir,'front',f'{name}_front_U_1.csv')
+    os.utime(path,ns=(0,0))
+    def Interrupt(*args,**kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(LoadExperimental.json,'dump',Interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        LoadExperimental.LoadExperimental(name,zlims)
+    assert not os.path.exists(manifest)
+    monkeypatch.undo()
+
+    # Cache is rebuilt, not loaded half-written, with same results
+    monkeypatch.chdir(tmp_path)
+    cacheX,cacheU,_ = LoadExperimental.LoadExperimental(name,zlims)
+    with open(manifest) as f:
+        assert json.load(f)[2] == [os.path.basename(path),
+                                   os.path.getsize(path),0]
+    np.testing.assert_array_equal(cacheX,expX)
+    np.testing.assert_array_equal(cacheU,expU)
+
+    # and loaded from cache on later runs
+    cacheX,cacheU,_ = LoadExperimental.LoadExperimental(name,zlims)
+    assert isinstance(cacheU,np.memmap)
+    np.testing.assert_array_equal(cacheU,expU)
@@ -0,0 +1,57 @@
+import os
+from importlib import import_module
+
+import numpy as np
+import pytest
+
+LoadNumerical = import_module('_subroutines.LoadNumerical')
+
+KEYS = ['gridX','gridLE']
+
+def Entry(edir,value,keys=KEYS):
+
+    # Cache entry with arrays of given value
+    os.makedirs(edir)
+    for k in keys:
+        np.save(os.path.join(edir,f'{k}.npy'),np.full(3,value))
+
+def Stored(edir):
+
+    return [np.load(os.path.join(edir,f'{k}.npy'))[0] for k in KEYS]
+
+def test_commit_entry_to_empty_cache(tmp_path):
+
+    edir = os.path.join(tmp_path,'key')
+    Entry(f'{edir}.tmp',1.0)
+    LoadNumerical.CommitEntry(edir,KEYS)
+
+    assert not os.path.exists(f'{edir}.tmp')
+    assert Stored(edir) == [1.0,1.0]
+
+def test_commit_entry_over_valid_entry(tmp_path):
+
+    # Entry already stored by another run is kept
+    edir = os.path.join(tmp_path,'key')
+    Entry(edir,2.0)
+    Entry(f'{edir}.tmp',1.0)
+    LoadNumerical.CommitEntry(edir,KEYS)
+
+    assert not os.path.exists(f'{edir}.tmp')
+    assert Stored(edir) == [2.0,2.0]
+
+def test_commit_entry_over_stale_entry(tmp_path):
+
+    # Partially evicted entry is replaced
+    edir = os.path.join(tmp_path,'key')
+    Entry(edir,2.0,keys=KEYS[:1])
+    Entry(f'{edir}.tmp',1.0)
+    assert not LoadNumerical.ValidEntry(edir,KEYS)
+    LoadNumerical.CommitEntry(edir,KEYS)
+
+    assert not os.path.exists(f'{edir}.tmp')
+    assert Stored(edir) == [1.0,1.0]
+
+def test_commit_missing_entry_raises(tmp_path):
+
+    with pytest.raises(OSError):
+        LoadNumerical.CommitEntry(os.path.join(tmp_path,'key'),KEYS)
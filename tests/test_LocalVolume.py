@@ -0,0 +1,117 @@
+import copy
+import numpy as np
+import pytest
+
+import _subroutines
+
+def Specimen(nny=5,nnx=6,nnz=5,nf=4,seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # Front, middle and back surfaces of regular grid in all increments
+    y,x = np.meshgrid(np.arange(nny,dtype=float),np.arange(nnx,dtype=float),
+                      indexing='ij')
+    gridX = np.zeros((nny,nnx,3,3,nf))
+    for f in range(nf):
+        thick = 1.0 - 0.05*f*(1 + 0.5*np.sin(x + y))
+        for s,side in enumerate([1.0,0.0,-1.0]):
+            gridX[:,:,s,0,f] = x*(1 + 0.04*f)
+            gridX[:,:,s,1,f] = y*(1 - 0.02*f)
+            gridX[:,:,s,2,f] = side*thick
+        gridX[...,f] += 1e-2*f*rng.standard_normal((nny,nnx,3,3))
+
+    # Nodes outside geometry
+    gridX[0,:2,...] = np.nan
+
+    gridZ = np.repeat(np.linspace(0,1,nnz)[None,None,:,None],nny,0)
+    gridZ = np.repeat(np.repeat(gridZ,nnx,1),nf,3)
+
+    recX,evol = _subroutines.Reconstruct(gridX,gridZ,nny,nnx,nnz,nf)
+    eFEM = {'X': recX,'EVOL': evol}
+
+    return eFEM,gridX,gridZ
+
+def Sequential(eFEM,gridX,gridZ,nny,nnx,nnz,nf,strategy,speed):
+
+    # Sequential reconstruction warm started from previous increment
+    seqFEM,seqZ = copy.deepcopy(eFEM),np.copy(gridZ)
+    for f in range(1,nf):
+        _subroutines.LocalVolume(f,seqFEM,gridX,seqZ,nny,nnx,nnz,
+                                 'incremental',strategy,speed,
+                                 seed=f-1 if f > 1 else None)
+
+    return seqFEM,seqZ
+
+def Speculative(eFEM,gridX,gridZ,nny,nnx,nnz,nf,strategy,speed,**kwargs):
+
+    # Speculative reconstruction with counters of rounds
+    _subroutines.EnableProfile('time')
+    try:
+        with _subroutines.Stage('LocalVolume'):
+            parFEM,parZ = _subroutines.IncrementalVolume(eFEM,gridX,gridZ,
+                                                         nny,nnx,nnz,nf,
+                                                         strategy,speed,
+                                                         workers=2,**kwargs)
+        counters = _subroutines.CollectProfile()[-1]['counters']
+    finally:
+        _subroutines.EnableProfile(None)
+
+    return parFEM,parZ,counters
+
+def test_incremental_matches_sequential_with_nan_elements():
+
+    nny,nnx,nnz,nf = 5,6,5,4
+    eFEM,gridX,gridZ = Specimen(nny,nnx,nnz,nf)
+    assert np.isnan(eFEM['EVOL']).any()
+
+    seqFEM,seqZ = Sequential(eFEM,gridX,gridZ,nny,nnx,nnz,nf,'bias','fast')
+
+    # Reconstruction wrt. undeformed volume
+    totFEM,totZ = copy.deepcopy(eFEM),np.copy(gridZ)
+    for f in range(1,nf):
+        _subroutines.LocalVolume(f,totFEM,gridX,totZ,nny,nnx,nnz,
+                                 'total','bias','fast')
+
+    parFEM,parZ,_ = Speculative(eFEM,gridX,gridZ,nny,nnx,nnz,nf,
+                                'bias','fast',tol=0.0)
+
+    np.testing.assert_allclose(parZ,seqZ,equal_nan=True)
+    np.testing.assert_allclose(parFEM['EVOL'],seqFEM['EVOL'],equal_nan=True)
+    assert not np.allclose(parZ[...,-1],totZ[...,-1])
+
+def test_incremental_completes_sequentially_at_maxiter():
+
+    nny,nnx,nnz,nf = 5,6,5,4
+    eFEM,gridX,gridZ = Specimen(nny,nnx,nnz,nf)
+
+    seqFEM,seqZ = Sequential(eFEM,gridX,gridZ,nny,nnx,nnz,nf,'bias','fast')
+    parFEM,parZ,counters = Speculative(eFEM,gridX,gridZ,nny,nnx,nnz,nf,
+                                       'bias','fast',tol=0.0,maxiter=1)
+
+    assert counters['rounds'] == 1
+    assert counters['sequential'] == nf - 2
+    np.testing.assert_array_equal(parZ,seqZ)
+    np.testing.assert_array_equal(parFEM['EVOL'],seqFEM['EVOL'])
+
+@pytest.mark.parametrize('strategy',['bias','optimise'])
+def test_incremental_rounds_at_default_tolerance(strategy):
+
+    nny,nnx,nnz,nf = 6,7,7,8
+    eFEM,gridX,gridZ = Specimen(nny,nnx,nnz,nf)
+
+    seqFEM,_ = Sequential(eFEM,gridX,gridZ,nny,nnx,nnz,nf,strategy,'fast')
+    parFEM,_,counters = Speculative(eFEM,gridX,gridZ,nny,nnx,nnz,nf,
+                                    strategy,'fast')
+
+    # Fewer rounds and optimisations than sequential rounds
+    assert counters['rounds'] < nf - 1
+    assert counters['speculative'] + counters.get('sequential',0) \
+           < nf*(nf-1)/2
+
+    # Error of each increment against previous one within tolerance of
+    #   sequential reconstruction
+    seqE,parE = seqFEM['EVOL'],parFEM['EVOL']
+    seqError = _subroutines.VolumeError(seqE[...,1:],seqE[...,:-1])
+    parError = _subroutines.VolumeError(parE[...,1:],parE[...,:-1])
+    assert parError[0] == seqError[0]
+    assert np.all(parError <= 1.25*seqError)
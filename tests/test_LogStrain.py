@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import _subroutines
+from conftest import Deformed
+
+@pytest.mark.parametrize('fast',[True,False])
+@pytest.mark.parametrize('memory',[1,8*64*4*2*3])
+def test_chunked_strain_matches_unchunked(fast,memory):
+
+    nny,nnx,nnz,nf = 6,5,3,4
+    coord,displ = Deformed(nny,nnx,nnz,nf)
+
+    # More than one block of elements rows and increments
+    chunks = _subroutines.StrainChunks(nny-1,nnx-1,nnz-1,nf,memory,fast)
+    assert len(chunks) > 1
+
+    strain = _subroutines.LogStrain(coord,displ,nny,nnx,nnz,nf,fast=fast)
+    chunked = _subroutines.LogStrain(coord,displ,nny,nnx,nnz,nf,fast=fast,
+                                     memory=memory)
+
+    np.testing.assert_allclose(chunked,strain,rtol=1e-12,atol=1e-14)
+
+def test_chunked_strain_into_out():
+
+    nny,nnx,nnz,nf = 6,5,3,4
+    coord,displ = Deformed(nny,nnx,nnz,nf)
+    strain = _subroutines.LogStrain(coord,displ,nny,nnx,nnz,nf,fast=True)
+
+    # Increment-major displacements and preallocated strain
+    displ = _subroutines.ToLayout(displ,'increment')
+    out = _subroutines.Allocate((nny-1,nnx-1,nnz-1,6,nf))
+    chunked = _subroutines.LogStrain(coord,displ,nny,nnx,nnz,nf,fast=True,
+                                     memory=1,out=out)
+
+    assert chunked is out
+    np.testing.assert_allclose(out,strain,rtol=1e-12,atol=1e-14)
+
+    # Single increment without increments dimension
+    single = _subroutines.LogStrain(coord,displ[...,-1],nny,nnx,nnz,
+                                    fast=True,memory=1)
+    np.testing.assert_allclose(single,strain[...,-1],rtol=1e-12,atol=1e-14)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import _subroutines
+from conftest import Plate
+
+def Patches(batch,nnz,seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # Distorted 3x3 patches of plate and z-positions of their nodes
+    gridX,gridZ = Plate(3,3,nnz,outside=False)
+    Xij = gridX + 0.1*rng.standard_normal(batch + gridX.shape)
+    Zij = np.broadcast_to(gridZ,batch + gridZ.shape).copy()
+    Zn = np.sort(rng.uniform(0,1,batch + (nnz,)),-1)
+    Zn[...,0],Zn[...,-1] = 0,1
+
+    return Xij,Zij,Zn
+
+def Reference(Xij,Zij,Zn):
+
+    # Volume of 2x2 elements through reconstructed points of each patch
+    nnz = Zn.shape[-1]
+    batch = Zn.shape[:-1]
+    evol = np.empty(batch + (2,2,nnz-1))
+    for b in np.ndindex(batch):
+        optiZ = np.copy(Zij[b])
+        optiZ[1,1,:] = Zn[b]
+        recX = _subroutines.Bezier(Xij[b],optiZ)
+        coord = _subroutines.ReshapeMesh(recX,3,3,nnz)
+        evol[b] = np.reshape(_subroutines.ElHex8R(coord,volume=True),
+                             (2,2,nnz-1))
+
+    return evol
+
+@pytest.mark.parametrize('batch',[(),(4,),(2,3)])
+def test_patch_volume_matches_elements_volume(batch):
+
+    nnz = 9
+    Xij,Zij,Zn = Patches(batch,nnz)
+    inv = _subroutines.PatchInvariants(Xij,Zij)
+
+    evol = _subroutines.PatchVolume(Zn,inv)
+    np.testing.assert_allclose(evol,Reference(Xij,Zij,Zn),
+                               rtol=1e-12,atol=1e-12)
+
+    # Same volume along with gradient
+    evolG,_ = _subroutines.PatchVolume(Zn,inv,gradient=True)
+    np.testing.assert_array_equal(evolG,evol)
+
+@pytest.mark.parametrize('batch',[(),(3,)])
+def test_patch_gradient_matches_finite_differences(batch):
+
+    nnz,eps = 9,1e-6
+    Xij,Zij,Zn = Patches(batch,nnz,seed=1)
+    inv = _subroutines.PatchInvariants(Xij,Zij)
+    _,dVdz = _subroutines.PatchVolume(Zn,inv,gradient=True)
+
+    # Central differences wrt. each z-position of node
+    for k in range(nnz):
+        dz = np.zeros(nnz)
+        dz[k] = eps
+        diff = (_subroutines.PatchVolume(Zn + dz,inv)
+                - _subroutines.PatchVolume(Zn - dz,inv))/(2*eps)
+        np.testing.assert_allclose(dVdz[...,k],diff,rtol=1e-6,atol=1e-8)
@@ -0,0 +1,30 @@
+import os
+import json
+
+import _subroutines
+
+def test_report_profile_twice(tmp_path,monkeypatch):
+
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join('output','P'))
+
+    _subroutines.EnableProfile('time')
+    try:
+        starts = []
+        for run in range(2):
+            with _subroutines.Stage('Run',f=run):
+                _subroutines.Count('calls')
+            _subroutines.ReportProfile('P')
+
+            with open(os.path.join('output','P','P_profile.json')) as f:
+                records = json.load(f)['records']
+            starts.append(records[0]['start'])
+
+            # Only records of current run with start relative to profile
+            assert len(records) == 1
+            assert records[0]['f'] == run
+            assert records[0]['counters'] == {'calls': 1}
+    finally:
+        _subroutines.EnableProfile(None)
+
+    assert 0 <= starts[0] <= starts[1]
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import _subroutines
+from conftest import Plate
+
+def Specimen(nny,nnx,nnz,nf,seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # Front and back surfaces with tilted normals and z-positions per increment
+    gridX,gridZ = Plate(nny,nnx,nnz)
+    gridX = np.repeat(gridX[...,None],nf,-1)
+    gridX[...,1,:,:] = 0
+    gridX += 0.05*rng.standard_normal(gridX.shape)
+    gridN = np.zeros((nny,nnx,2,3,nf))
+    gridN[...,:2,:] = 0.1*rng.standard_normal((nny,nnx,2,2,nf))
+    gridN[...,0,2,:] = 1
+    gridN[...,1,2,:] = -1
+    gridZ = np.repeat(gridZ[...,None],nf,-1)
+
+    return gridX,gridZ,gridN
+
+@pytest.mark.parametrize('memory',[None,1,8*(15*6*7*5 + 64*5*6*4)*2])
+def test_reconstruction_matches_increment_loop(memory):
+
+    nny,nnx,nnz,nf = 6,7,5,5
+    gridX,gridZ,gridN = Specimen(nny,nnx,nnz,nf)
+
+    # Middle surface, bezier curves and volume of each increment in turn
+    loopX = gridX.copy()
+    recX = np.zeros((nny,nnx,nnz,3,nf))
+    evol = np.zeros((nny-1,nnx-1,nnz-1,nf))
+    for f in range(nf):
+        loopX[...,f] = _subroutines.MidSurface(loopX[...,f],gridN[...,f])
+        recX[...,f] = _subroutines.Bezier(loopX[...,f],gridZ[...,f])
+        evol[...,f] = _subroutines.Volume(recX[...,f],nny,nnx,nnz)
+
+    # More than one block of increments within memory budget
+    chunks = _subroutines.ReconstructChunks(nny,nnx,nnz,nf,memory)
+    if memory is not None:
+        assert len(chunks) > 1
+
+    batchX = gridX.copy()
+    batchR,batchV = _subroutines.Reconstruct(batchX,gridZ,nny,nnx,nnz,nf,
+                                             gridN,memory)
+
+    np.testing.assert_allclose(batchX,loopX,rtol=1e-12,atol=1e-14)
+    np.testing.assert_allclose(batchR,recX,rtol=1e-12,atol=1e-14)
+    np.testing.assert_allclose(batchV,evol,rtol=1e-12,atol=1e-14)
+
+def test_reconstruction_into_increment_layout():
+
+    nny,nnx,nnz,nf = 6,7,5,5
+    gridX,gridZ,gridN = Specimen(nny,nnx,nnz,nf)
+    recX,evol = _subroutines.Reconstruct(gridX.copy(),gridZ,nny,nnx,nnz,nf,
+                                         gridN)
+
+    # Increment-major grids and preallocated results
+    layoutX = _subroutines.ToLayout(gridX,'increment')
+    layoutZ = _subroutines.ToLayout(gridZ,'increment')
+    outX = _subroutines.Allocate((nny,nnx,nnz,3,nf),'increment')
+    outV = _subroutines.Allocate((nny-1,nnx-1,nnz-1,nf),'increment')
+    batchR,batchV = _subroutines.Reconstruct(layoutX,layoutZ,nny,nnx,nnz,nf,
+                                             gridN,1,outX,outV)
+
+    assert batchR is outX and batchV is outV
+    np.testing.assert_allclose(outX,recX,rtol=1e-12,atol=1e-14)
+    np.testing.assert_allclose(outV,evol,rtol=1e-12,atol=1e-14)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from scipy.signal import savgol_filter
+
+import _subroutines
+
+@pytest.mark.parametrize('n',[3,4,7,12])
+def test_savgol_matrix_matches_filter(n):
+
+    z = np.random.default_rng(n).random((n,5))
+
+    # Full-length window with polynomial fit at the edges
+    np.testing.assert_allclose(_subroutines.SavgolMatrix(n) @ z,
+                               savgol_filter(z,n,2,axis=0,mode='interp'),
+                               rtol=1e-12,atol=1e-12)
+
+def test_smooth_matches_line_filters():
+
+    nny,nnx,nnz = 5,8,7
+    rng = np.random.default_rng(0)
+
+    maskZ = np.full((nny+2,nnx+2,nnz,2),np.nan)
+    maskZ[1:-1,1:-1,...] = np.sort(rng.random((nny,nnx,nnz,2)),2)
+
+    # Smoothing of each row and then each column of interior layers
+    refZ = np.copy(maskZ)
+    for i in range(1,nny+1):
+        for k in range(1,nnz-1):
+            refZ[i,1:-1,k,0] = savgol_filter(refZ[i,1:-1,k,0],nnx,2)
+    for j in range(1,nnx+1):
+        for k in range(1,nnz-1):
+            refZ[1:-1,j,k,0] = savgol_filter(refZ[1:-1,j,k,0],nny,2)
+
+    optiZ = _subroutines.SmoothZ(np.copy(maskZ),nny,nnx,nnz)
+
+    np.testing.assert_allclose(optiZ,refZ,rtol=1e-12,atol=1e-12,
+                               equal_nan=True)